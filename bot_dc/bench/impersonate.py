@@ -0,0 +1,43 @@
+"""
+Microbenchmark for minting impersonation tokens.
+
+Replays a stream of commands from a set of users and reports tokens per second
+for signing a fresh JWT on every command and for the per-user ``TokenCache``.
+
+Usage (from the ``bot_dc`` directory)::
+
+    python -m bench.impersonate [commands] [users]
+"""
+
+import os
+import random
+import sys
+import time
+from collections.abc import Callable
+
+_ = os.environ.setdefault("JWT_SECRET", "bench-secret-bench-secret-bench-secret")
+
+from helpers.impersonate import JWTHandler, TokenCache
+
+
+def measure(name: str, mint: Callable[[int], str], stream: list[int]) -> None:
+    start = time.perf_counter()
+    for user_id in stream:
+        _ = mint(user_id)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {len(stream) / elapsed:12,.0f} tokens/s  {elapsed / len(stream) * 1e6:7.2f} us/token")
+
+
+def main() -> None:
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rnd = random.Random(0)
+    stream = [rnd.randrange(users) for _ in range(commands)]
+    handler = JWTHandler(os.environ["JWT_SECRET"])
+    print(f"{commands} commands from {users} users")
+    measure("sign each time", handler.create_user, stream)
+    measure("TokenCache", TokenCache(handler).get, stream)
+
+
+if __name__ == "__main__":
+    main()
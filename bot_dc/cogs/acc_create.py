@@ -1,14 +1,10 @@
-import os
-
 from discord.ext.commands import Cog, Bot
 from discord.ext import commands
 from discord import app_commands, Interaction
 from discord.app_commands import allowed_contexts, allowed_installs
-from helpers.impersonate import impersonate_user
+from helpers.api_client import APIError
 import discord
 
-import aiohttp
-
 class CreateAcc(Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -18,21 +14,21 @@ class CreateAcc(Cog):
     @app_commands.command(name="create_acc", description="Create an account")
     async def create_acc(self, interaction: Interaction):
         await interaction.response.defer()
-        jwt = impersonate_user(interaction.user.id)
-        async with aiohttp.ClientSession(os.environ["INTERNAL_LINK"]) as session:
-            async with session.post("/user/create", headers={"X-API-KEY": jwt}) as req:
-                if req.ok:
-                    return await interaction.followup.send(embed=discord.Embed(
-                        title="Success",
-                        description="We have created your account, start playing!",
-                        color=discord.Color.green()
-                    ))
-                if req.status == 409:
-                    return await interaction.followup.send(embed=discord.Embed(
-                        title="Error",
-                        description="You already have an account",
-                        color=discord.Color.red()
-                    ))
+        try:
+            _ = await self.bot.api.create_user(interaction.user.id)
+        except APIError as e:
+            if e.status == 409:
+                return await interaction.followup.send(embed=discord.Embed(
+                    title="Error",
+                    description="You already have an account",
+                    color=discord.Color.red()
+                ))
+        else:
+            return await interaction.followup.send(embed=discord.Embed(
+                title="Success",
+                description="We have created your account, start playing!",
+                color=discord.Color.green()
+            ))
         return await interaction.followup.send(embed=discord.Embed(
             title="Error",
             description="Something went wrong",
@@ -1,18 +1,40 @@
-import os, secrets
+import secrets
+import time
 from typing import Optional
 
 from discord.ext.commands import Cog, Bot
 from discord.ext import commands
 from discord import app_commands, Interaction
 from discord.app_commands import allowed_contexts, allowed_installs
-from helpers.impersonate import impersonate_user
+from helpers.api_client import APIError
 import discord
 
-import aiohttp
+# How long a game handed out with a flip is kept for the next one. The server deletes
+# unplayed games a day after creating them and its pool hands them out up to 12h old.
+NEXT_GAME_TTL = 6 * 60 * 60
 
 class CoinFlip(Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Game handed out with the previous flip of each user and when it was, saves the /game/init call
+        self.next_games: dict[int, tuple[str, float]] = {}
+
+    def _cached_game(self, user_id: int) -> Optional[tuple[str, float]]:
+        entry = self.next_games.pop(user_id, None)
+        if entry is None or time.monotonic() - entry[1] > NEXT_GAME_TTL:
+            return None
+        return entry
+
+    async def _init_game(self, interaction: Interaction) -> Optional[str]:
+        """A new game for the user, or None once they were told why there is none."""
+        try:
+            return (await self.bot.api.init_game(interaction.user.id))["game_id"]
+        except APIError as e:
+            if e.status == 404:
+                await interaction.followup.send(embed=discord.Embed(title="You don't have an account yet", color=discord.Color.red(), description="Create an account with `/create_acc` first!"))
+            else:
+                await interaction.followup.send(embed=discord.Embed(title="Error", description="Could not start a game because the server hate you", color=discord.Color.red()))
+            return None
     
     @allowed_contexts(guilds=True, dms=True, private_channels=True)
     @allowed_installs(guilds=True, users=True)
@@ -27,64 +49,76 @@ class CoinFlip(Cog):
     ])
     async def coinflip(self, interaction: Interaction, side: app_commands.Choice[str], amount: app_commands.Range[int, 1], client_secret: Optional[str] = None):
         await interaction.response.defer()
-        jwt = impersonate_user(interaction.user.id)
-        
-        async with aiohttp.ClientSession(os.environ["INTERNAL_LINK"], headers={"X-API-KEY": jwt}) as session:
-            async with session.post("/game/init") as init_resp:
-                if not init_resp.ok:
-                    if init_resp.status == 404:
-                         return await interaction.followup.send(embed=discord.Embed(title="You don't have an account yet", color=discord.Color.red(), description="Create an account with `/create_acc` first!"))
-                    return await interaction.followup.send(embed=discord.Embed(title="Error", description="Could not start a game because the server hate you", color=discord.Color.red()))
-                game_data = await init_resp.json()
-                game_id = game_data["game_id"]
-            if not client_secret:
-                client_secret = secrets.token_hex(64)
-            payload = {
-                "client_secret": client_secret,
-                "amount": amount,
-                "coin_id": 0, 
-                "side": side.value == "heads" # True for heads, False for tails
-            }
-
-            async with session.post(f"/game/play_coinflip/{game_id}", json=payload) as play_resp:
-                if play_resp.ok:
-                    play_data = await play_resp.json()
-                    win = play_data["win"]
-                    net_delta = play_data["user_net_delta"]
+        api = self.bot.api
+        cached = self._cached_game(interaction.user.id)
+        if cached is not None:
+            game_id, handed_out = cached
+        else:
+            game_id, handed_out = await self._init_game(interaction), time.monotonic()
+            if game_id is None:
+                return
+        if not client_secret:
+            client_secret = secrets.token_hex(64)
 
-                    if win:
-                        embed = discord.Embed(
-                            title="You Won?",
-                            description=f"That's impossible, we make sure to rigged the game so you cannot win\n-# The coin landed on **{side.name}**. You won **{net_delta}** coins!",
-                            color=discord.Color.green()
-                        )
-                    else:
-                        embed = discord.Embed(
-                            title="You Lost.",
-                            description=f"(Really what do you expected)\n-# The coin landed on the other side. You lost **{abs(net_delta)}** coins.",
-                            color=discord.Color.red()
-                        )
-                    
-                    tx_id = play_data.get("transaction", {}).get("tx")
-                    if tx_id:
-                        embed.set_footer(text=f"TX: {tx_id}")
+        async def flip(game_id: str):
+            return await api.coinflip(
+                interaction.user.id,
+                game_id,
+                client_secret,
+                amount,
+                side.value == "heads", # True for heads, False for tails
+            )
 
-                    return await interaction.followup.send(embed=embed)
-                
-                if play_resp.status == 422:
-                    return await interaction.followup.send(embed=discord.Embed(
-                        title="You cannot be spending that much", 
-                        description=f"Our intelligence agent has identified and prevented you from overdrafting because they do not " 
-                        "believe you can pay back the **{amount}** coins that you are trying to gamble.", color=discord.Color.orange()))
-                
-                error_details = await play_resp.text()
-                return await interaction.followup.send(
-                    embed=discord.Embed(
-                        title=f"Error: {play_resp.status}", 
-                        description=f"An unexpected error occurred(The server hate you).\n```{error_details}```", 
-                        color=discord.Color.red()
-                    )
+        try:
+            try:
+                play_data = await flip(game_id)
+            except APIError as e:
+                if cached is None or e.status not in (400, 404):
+                    raise
+                # The cached game is gone, e.g. swept by the server after a day unplayed
+                game_id, handed_out = await self._init_game(interaction), time.monotonic()
+                if game_id is None:
+                    return
+                play_data = await flip(game_id)
+        except APIError as e:
+            if e.status not in (400, 404):
+                # The game was not played, keep it for the next flip
+                _ = self.next_games.setdefault(interaction.user.id, (game_id, handed_out))
+            if e.status == 422:
+                return await interaction.followup.send(embed=discord.Embed(
+                    title="You cannot be spending that much", 
+                    description=f"Our intelligence agent has identified and prevented you from overdrafting because they do not " 
+                    "believe you can pay back the **{amount}** coins that you are trying to gamble.", color=discord.Color.orange()))
+            return await interaction.followup.send(
+                embed=discord.Embed(
+                    title=f"Error: {e.status}", 
+                    description=f"An unexpected error occurred(The server hate you).\n```{e.detail}```", 
+                    color=discord.Color.red()
                 )
+            )
+
+        self.next_games[interaction.user.id] = (play_data["next_game"]["game_id"], time.monotonic())
+        win = play_data["win"]
+        net_delta = play_data["user_net_delta"]
+
+        if win:
+            embed = discord.Embed(
+                title="You Won?",
+                description=f"That's impossible, we make sure to rigged the game so you cannot win\n-# The coin landed on **{side.name}**. You won **{net_delta}** coins!",
+                color=discord.Color.green()
+            )
+        else:
+            embed = discord.Embed(
+                title="You Lost.",
+                description=f"(Really what do you expected)\n-# The coin landed on the other side. You lost **{abs(net_delta)}** coins.",
+                color=discord.Color.red()
+            )
+        
+        tx_id = play_data.get("transaction", {}).get("tx")
+        if tx_id:
+            embed.set_footer(text=f"TX: {tx_id}")
+
+        return await interaction.followup.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(CoinFlip(bot))
\ No newline at end of file
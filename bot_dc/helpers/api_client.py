@@ -0,0 +1,183 @@
+import asyncio
+import uuid
+from typing import Any, Literal, TypedDict
+
+import aiohttp
+
+from helpers.impersonate import impersonate_user
+
+SYSTEM_USER = 0
+RETRIES = 2
+
+
+class APIError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(f"{status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class Account(TypedDict):
+    id: int
+    holder_id: int
+    balance: dict[str, int]
+
+
+class Game(TypedDict):
+    id: int
+    server_secret: str
+    client_secret: str
+    user_win: bool
+    game_instance: str
+
+
+class Transaction(TypedDict):
+    id: int
+    tx: str
+    src: int
+    dst: int
+    coin_id: int
+    coin_unique_name: str
+    coin_read_name: str
+    amount: int
+    kind: Literal["none", "reward", "game"]
+    reason: str
+    inner_hash: str
+    create_dt: str
+    transact_data: str
+    reward: dict[str, Any] | None
+    game: Game | None
+
+
+class Profile(TypedDict):
+    balance: dict[str, int]
+    transactions: list[Transaction]
+
+
+class GameInit(TypedDict):
+    game_id: str
+    hame_hash: str
+
+
+class CoinFlipResult(TypedDict):
+    win: bool
+    user_net_delta: int
+    transaction: Transaction
+    game_hash: str
+    next_game: GameInit
+
+
+class APIClient:
+    """
+    Client for the GambaBot server shared by every cog.
+
+    One keep-alive session is opened for the lifetime of the bot, so commands reuse
+    pooled connections instead of paying for DNS and a new connection each time.
+    Authenticated methods take the Discord user to act as. Every method raises
+    :class:`APIError` for a non-2xx response. Reads, and writes sent with an ``Idempotency-Key``, are
+    retried when the connection fails or times out.
+    """
+
+    def __init__(self, base_url: str, *, limit: int = 100, timeout: float = 10.0):
+        self._base_url = base_url
+        self._limit = limit
+        self._timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    async def start(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit,
+            ttl_dns_cache=300,
+            # Below uvicorn's 5s keep-alive, so an idle connection is never reused after the server dropped it
+            keepalive_timeout=4,
+        )
+        self._session = aiohttp.ClientSession(
+            self._base_url,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self._timeout),
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        user_id: int | None = None,
+        *,
+        json: Any = None,
+        idempotent: bool = False,
+    ) -> Any:
+        if self._session is None:
+            raise RuntimeError("APIClient.start() was not called")
+        headers: dict[str, str] = {}
+        if user_id is not None:
+            headers["X-API-KEY"] = impersonate_user(user_id)
+        if method != "GET":
+            if not idempotent:
+                return await self._send(method, path, headers, json)
+            # The same key on every attempt, so the server applies the write at most once
+            headers["Idempotency-Key"] = str(uuid.uuid4())
+        for attempt in range(RETRIES + 1):
+            try:
+                return await self._send(method, path, headers, json)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == RETRIES:
+                    raise
+
+    async def _send(self, method: str, path: str, headers: dict[str, str], json: Any) -> Any:
+        assert self._session is not None
+        async with self._session.request(method, path, headers=headers, json=json) as resp:
+            if not resp.ok:
+                raise APIError(resp.status, await resp.text())
+            return await resp.json()
+
+    async def create_user(self, user_id: int) -> dict[str, Any]:
+        return await self._request("POST", "/user/create", user_id)
+
+    async def get_user(self, user_id: int) -> dict[str, Any]:
+        return await self._request("GET", f"/user/get/{user_id}")
+
+    async def get_profile(self, user_id: int) -> Profile:
+        return await self._request("GET", "/user/profile/@me", user_id)
+
+    async def list_accounts(self, user_id: int) -> list[Account]:
+        return await self._request("GET", "/account/list/@me", user_id)
+
+    async def get_transaction(self, identifier: str) -> Transaction:
+        return await self._request("GET", f"/transaction/get/{identifier}")
+
+    async def pay(
+        self, user_id: int, src: int, dst: int, amount: int, coin_id: int = 0
+    ) -> Transaction:
+        return await self._request(
+            "POST",
+            "/transaction/pay",
+            user_id,
+            json={"src": src, "dst": dst, "coin_id": coin_id, "amount": amount},
+            idempotent=True,
+        )
+
+    async def init_game(self, user_id: int) -> GameInit:
+        return await self._request("POST", "/game/init", user_id)
+
+    async def coinflip(
+        self, user_id: int, game_id: str, client_secret: str, amount: int, side: bool, coin_id: int = 0
+    ) -> CoinFlipResult:
+        return await self._request(
+            "POST",
+            "/game/coinflip",
+            user_id,
+            json={
+                "game_id": game_id,
+                "client_secret": client_secret,
+                "amount": amount,
+                "coin_id": coin_id,
+                "side": side,
+            },
+            idempotent=True,
+        )
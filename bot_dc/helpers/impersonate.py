@@ -2,6 +2,7 @@ import os
 import logging
 
 from typing import Final
+from collections import OrderedDict
 from collections.abc import Mapping, Sequence
 import jwt
 import time
@@ -27,11 +28,12 @@ class JWTHandler:
         except jwt.InvalidTokenError:
             return False
 
-    def create_user(self, user_id: int, ttl: float = 86400) -> str:
+    def create_user(self, user_id: int, ttl: float = 86400, now: float | None = None) -> str:
+        now = time.time() if now is None else now
         payload = {
-            "nbt": time.time(),
-            "iat": time.time(),
-            "exp": time.time() + ttl,
+            "nbt": now,
+            "iat": now,
+            "exp": now + ttl,
             "iss": "gamba_bot",
             "aud": [f"use"],
             "user_id": user_id,
@@ -39,8 +41,37 @@ class JWTHandler:
         return self.encode(payload)
 
 
+class TokenCache:
+    """
+    Per-user tokens minted by ``handler``, re-used until they are within ``margin``
+    seconds of expiring. Holds at most ``maxsize`` users, evicting the least
+    recently used.
+    """
+
+    def __init__(self, handler: JWTHandler, maxsize: int = 4096, ttl: float = 86400, margin: float = 3600):
+        self._handler = handler
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._margin = margin
+        self._tokens: OrderedDict[int, tuple[str, float]] = OrderedDict()
+
+    def get(self, user_id: int) -> str:
+        now = time.time()
+        cached = self._tokens.get(user_id)
+        if cached is not None and cached[1] - now > self._margin:
+            self._tokens.move_to_end(user_id)
+            return cached[0]
+        token = self._handler.create_user(user_id, self._ttl, now)
+        self._tokens[user_id] = (token, now + self._ttl)
+        self._tokens.move_to_end(user_id)
+        if len(self._tokens) > self._maxsize:
+            _ = self._tokens.popitem(last=False)
+        return token
+
+
 jwt_handler = JWTHandler(os.environ["JWT_SECRET"])
+token_cache = TokenCache(jwt_handler)
 
 def impersonate_user(user_id: int) -> str:
-    return jwt_handler.create_user(user_id)
+    return token_cache.get(user_id)
 
@@ -8,6 +8,8 @@ import os
 
 load_dotenv()  # pyright: ignore[reportUnusedCallResult]
 
+from helpers.api_client import APIClient
+
 TOKEN = os.getenv("DISCORD_TOKEN")
 
 if TOKEN is None:
@@ -16,7 +18,27 @@ if TOKEN is None:
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class GambaBot(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Set in setup_hook, which never runs if logging in fails
+        self.api: APIClient | None = None
+
+    async def setup_hook(self):
+        # One pooled session for every cog, for as long as the bot runs
+        self.api = APIClient(os.environ["INTERNAL_LINK"])
+        await self.api.start()
+
+    async def close(self):
+        try:
+            if self.api is not None:
+                await self.api.close()
+        finally:
+            await super().close()
+
+
+bot = GambaBot(command_prefix="!", intents=intents)
 
 COGS_DIR = Path() / "cogs"
 
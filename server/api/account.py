@@ -6,19 +6,20 @@ from fastapi.responses import JSONResponse
 
 from schema.db import Account
 from helper.jwt_helper import get_user
-from helper.db_helper import get_tx_conn
+from helper.db_helper import get_read_conn
+from helper.json_response import JSONRoute
 from database.account import get_raw_user_account, get_account_by_id
 from database.user import get_user as get_db_user, user_exist
 
 acc_app = FastAPI()
 
-public_router = APIRouter()
-protected_router = APIRouter(dependencies=[Depends(get_user)])
+public_router = APIRouter(route_class=JSONRoute)
+protected_router = APIRouter(dependencies=[Depends(get_user)], route_class=JSONRoute)
 
 
 @protected_router.get("/list/@me")
 async def list_auth_self_accounts(
-    conn: Annotated[asqlite.ProxiedConnection, Depends(get_tx_conn)],
+    conn: Annotated[asqlite.ProxiedConnection, Depends(get_read_conn)],
     user_id: Annotated[int, Depends(get_user)],
 ) -> list[Account]:
     user = await user_exist(conn, user_id)
@@ -29,7 +30,7 @@ async def list_auth_self_accounts(
 
 @public_router.get("/list/{user_id:int}")
 async def list_user_accounts(
-    conn: Annotated[asqlite.ProxiedConnection, Depends(get_tx_conn)], user_id: int
+    conn: Annotated[asqlite.ProxiedConnection, Depends(get_read_conn)], user_id: int
 ) -> list[Account]:
     user = await user_exist(conn, user_id)
     if not user:
@@ -38,7 +39,7 @@ async def list_user_accounts(
 
 @public_router.get("/exist/{account_id:int}")
 async def check_account_exist(
-    conn: Annotated[asqlite.ProxiedConnection, Depends(get_tx_conn)],
+    conn: Annotated[asqlite.ProxiedConnection, Depends(get_read_conn)],
     account_id: int,
 ) -> bool:
     try:
@@ -49,7 +50,7 @@ async def check_account_exist(
 
 @public_router.get("/get/{account_id:int}")
 async def get_account(
-    conn: Annotated[asqlite.ProxiedConnection, Depends(get_tx_conn)],
+    conn: Annotated[asqlite.ProxiedConnection, Depends(get_read_conn)],
     account_id: int,
 ) -> Account:
     try:
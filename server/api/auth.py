@@ -3,13 +3,17 @@ import time
 import secrets
 from urllib.parse import urlencode
 
-from fastapi import FastAPI, HTTPException, Request
+from typing import Annotated
+
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from dotenv import load_dotenv
 from aiohttp import ClientSession
 
 from schema.discord import TokenResp, User
 from crypto.jwt_handler import JWTHandler
+from helper.http_client import get_http_client
+from helper.state_store import RedirectURL, StateStore, StateValue, get_state_store
 
 load_dotenv()  # pyright: ignore[reportUnusedCallResult]
 
@@ -23,34 +27,26 @@ jwt_handler = JWTHandler(JWT_SECRET)
 STATE_TTL_SECONDS = 300
 
 type JSON = dict[str, JSON] | list[JSON] | str | None | bool | float | int
-type StateValue = str
-type RedirectURL = str
-type TTL = float
 type DiscordToken = str
 
-# In-memory state store (sufficient for single-process dev)
-# For production / multi-instance: move to Redis or signed stateless token
-_pending_states: dict[StateValue, tuple[TTL, RedirectURL]] = {}
-
 
-def create_state(redirect: RedirectURL) -> StateValue:
+async def create_state(store: StateStore, redirect: RedirectURL) -> StateValue:
     state = secrets.token_urlsafe(24)
-    _pending_states[state] = time.time(), redirect
+    await store.put(state, redirect, time.time() + STATE_TTL_SECONDS)
     return state
 
 
-def validate_and_consume_state(state: StateValue) -> RedirectURL:
-    created = _pending_states.get(state)
+async def validate_and_consume_state(store: StateStore, state: StateValue) -> RedirectURL:
+    created = await store.pop(state)
     if not created:
         raise HTTPException(400, "Invalid or already used state")
-    if time.time() - created[0] > STATE_TTL_SECONDS:
-        _ = _pending_states.pop(state, None)
+    redirect, expires_at = created
+    if time.time() > expires_at:
         raise HTTPException(400, "State expired")
-    _ = _pending_states.pop(state, None)
-    return created[1]
+    return redirect
 
 
-async def discord_token_exchange(code: DiscordToken) -> TokenResp:
+async def discord_token_exchange(client: ClientSession, code: DiscordToken) -> TokenResp:
     form = {
         "client_id": DISCORD_CLIENT_ID,
         "client_secret": DISCORD_CLIENT_SECRET,
@@ -59,19 +55,17 @@ async def discord_token_exchange(code: DiscordToken) -> TokenResp:
         "redirect_uri": DISCORD_REDIRECT_URI,
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    async with ClientSession(timeout=15) as client:
-        resp = await client.post(
-            "https://discord.com/api/oauth2/token", data=form, headers=headers
-        )
+    async with client.post(
+        "https://discord.com/api/oauth2/token", data=form, headers=headers
+    ) as resp:
         if not resp.ok:
-            raise HTTPException(400, f"Code exchange failed: {resp.text}")
+            raise HTTPException(400, f"Code exchange failed: {await resp.text()}")
         return await resp.json()  # pyright: ignore[reportAny]
 
 
-async def fetch_discord_user(access_token: str) -> User:
+async def fetch_discord_user(client: ClientSession, access_token: str) -> User:
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with ClientSession(timeout=15) as client:
-        resp = await client.get("https://discord.com/api//users/@me", headers=headers)
+    async with client.get("https://discord.com/api/users/@me", headers=headers) as resp:
         if not resp.ok:
             raise HTTPException(400, "Failed to fetch Discord user")
         return await resp.json()  # pyright: ignore[reportAny]
@@ -87,12 +81,14 @@ def build_avatar_url(user: User) -> str:
 
 
 @auth_app.get("/discord/login")
-async def discord_login(redirect: str = "/"):
+async def discord_login(
+    store: Annotated[StateStore, Depends(get_state_store)], redirect: str = "/"
+):
     """
     Step 1: Redirect user to Discord authorization screen.
     Pass ?redirect=/some/path if you want to track post-login navigation client-side.
     """
-    state = create_state(redirect)
+    state = await create_state(store, redirect)
     params = {
         "client_id": DISCORD_CLIENT_ID,
         "redirect_uri": DISCORD_REDIRECT_URI,
@@ -106,11 +102,16 @@ async def discord_login(redirect: str = "/"):
 
 
 @auth_app.get("/discord/callback")
-async def discord_callback(code: str, state: str) -> RedirectResponse:
-    url = validate_and_consume_state(state)
-    token_data = await discord_token_exchange(code)
+async def discord_callback(
+    store: Annotated[StateStore, Depends(get_state_store)],
+    client: Annotated[ClientSession, Depends(get_http_client)],
+    code: str,
+    state: str,
+) -> RedirectResponse:
+    url = await validate_and_consume_state(store, state)
+    token_data = await discord_token_exchange(client, code)
     access_token = token_data["access_token"]
-    user = await fetch_discord_user(access_token)
+    user = await fetch_discord_user(client, access_token)
     resp = RedirectResponse(url, status_code=302)
     resp.set_cookie(
         "login",
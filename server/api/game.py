@@ -1,16 +1,19 @@
 from dataclasses import dataclass
 from random import Random
-import secrets
+from collections.abc import Awaitable, Callable, Iterable
 from typing import Annotated
 import uuid
 
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Response
 from database.account import get_raw_user_account
 from helper.jwt_helper import get_user
-from helper.db_helper import DB, get_tx_conn
+from helper.db_helper import DB, get_conn
+from helper.idempotency import Idempotency, get_idempotency
+from helper.ledger_writer import LedgerWriter, get_ledger
+from helper.game_pool import GameInstancePool, get_game_pool
+from helper.json_response import JSONRoute
 
 from database.game import (
-    create_game_instance,
     get_game_instance,
     mark_game_instance_completed,
 )
@@ -18,26 +21,31 @@ from database.holder import (
     game_force_transfer_holder_to_system,
     get_holder_coin_balance,
 )
-from database.transact import game_force_transfer, get_transaction_by_uni_id
+from database.transact import (
+    game_force_transfer,
+    get_transaction_by_uni_id,
+    get_transactions_by_uni_ids,
+)
 from database.user import get_user as get_db_user, user_exist
 
-from cryptography.hazmat.primitives.hashes import Hash, SHA3_512
+from crypto.hashing import sha3_512_hex, sha3_512_hex_many
 
 from schema.db import GameInstance, Transaction
 
 game_app = FastAPI()
 
-protected_router = APIRouter(dependencies=[Depends(get_user)])
-
+MAX_BATCH_GAMES = 100
 
-def _sha3_512_hex(data: str) -> str:
-    h = Hash(SHA3_512())
-    h.update(data.encode())
-    return h.finalize().hex()
+protected_router = APIRouter(dependencies=[Depends(get_user)], route_class=JSONRoute)
 
 
 def generate_run_secret(server_secret: str, client_secret: str) -> str:
-    return _sha3_512_hex(f"{server_secret}::{client_secret}")
+    return sha3_512_hex(f"{server_secret}::{client_secret}")
+
+
+def generate_run_secrets(pairs: Iterable[tuple[str, str]]) -> list[str]:
+    """Batch version of :func:`generate_run_secret` for ``(server_secret, client_secret)`` pairs."""
+    return sha3_512_hex_many(f"{server_secret}::{client_secret}" for server_secret, client_secret in pairs)
 
 
 @dataclass
@@ -65,13 +73,50 @@ class PlayResp:
     transaction: Transaction
 
 
+@dataclass
+class BatchCoinFlipGame:
+    game_id: str
+    client_secret: str
+    amount: int
+    side: bool
+
+
+@dataclass
+class BatchCoinFlipReq:
+    coin_id: int
+    games: list[BatchCoinFlipGame]
+
+
+@dataclass
+class BatchGameResult:
+    game_id: str
+    win: bool
+    user_net_delta: int
+    transaction: Transaction
+
+
+@dataclass
+class BatchPlayResp:
+    user_net_delta: int
+    results: list[BatchGameResult]
+
+
+@dataclass
+class QuickCoinFlipReq(CoinFlipReq):
+    game_id: str
+
+
+@dataclass
+class QuickPlayResp(PlayResp):
+    game_hash: str
+    next_game: InitResp
+
+
 @protected_router.post("/init")
 async def init_game(
-    conn: Annotated[DB, Depends(get_tx_conn)],
+    game_pool: Annotated[GameInstancePool, Depends(get_game_pool)],
 ) -> InitResp:
-    game_id = secrets.token_hex(64)
-    game_secret = secrets.token_hex(64)
-    dt = await create_game_instance(conn, game_id, game_secret)
+    dt = await game_pool.claim()
     return InitResp(dt.game_id, dt.game_hash)
 
 
@@ -92,7 +137,7 @@ async def gamble_handler(
     server_secret: str,
     client_secret: str,
     game_instance: str,
-) -> Transaction:
+) -> int:
     if user_win:
         tid = (
             await game_force_transfer(
@@ -120,35 +165,181 @@ async def gamble_handler(
                 game_instance=game_instance,
             )
         )[0]
-    transaction = await get_transaction_by_uni_id(conn, tid)
-    if not transaction:
-        raise ValueError("Transaction doesn't exist (wtf)")
-    return transaction
+    return tid
 
 
-@protected_router.post("/play_coinflip/{game_id}")
-async def conflip_game(
-    conn: Annotated[DB, Depends(get_tx_conn)],
-    user_id: Annotated[int, Depends(get_user)],
+async def _play_coinflip[R](
+    conn: DB,
+    ledger: LedgerWriter,
+    idempotency: Idempotency,
+    user_id: int,
     game_id: str,
     play_req: CoinFlipReq,
-) -> PlayResp:
+    render: Callable[[DB, GameInstance, PlayResp], Awaitable[R]],
+) -> R | Response:
     if not await user_exist(conn, user_id):
         raise HTTPException(404, "User not found")
     instance = await _handle_game(conn, game_id)
-    _ = await mark_game_instance_completed(conn, game_id)
-    if (
-        await get_holder_coin_balance(conn, (await get_db_user(conn, user_id)).holder_id, play_req.coin_id)
-        < play_req.amount
-    ):
+    holder_id = (await get_db_user(conn, user_id)).holder_id
+    if await get_holder_coin_balance(conn, holder_id, play_req.coin_id) < play_req.amount:
         raise HTTPException(403, "Attempt to gamble more than what you have")
     secret = generate_run_secret(instance.game_secret, play_req.client_secret)
     rnd = Random(secret)
     win = rnd.randint(0, 1) == 0
-    transaction = await gamble_handler(
-        conn, win, user_id, play_req, instance.game_secret, play_req.client_secret, instance.game_id
+
+    async def settle(writer: DB) -> R | Response:
+        # A retry with the same key may have been queued behind the original
+        if (replay := await idempotency.replay(writer)) is not None:
+            return replay
+        # Re-check under the write lock, another request may have raced us
+        try:
+            _ = await mark_game_instance_completed(writer, game_id)
+        except ValueError:
+            raise HTTPException(400, "The game have already been played")
+        if await get_holder_coin_balance(writer, holder_id, play_req.coin_id) < play_req.amount:
+            raise HTTPException(403, "Attempt to gamble more than what you have")
+        tid = await gamble_handler(
+            writer, win, user_id, play_req, instance.game_secret, play_req.client_secret, instance.game_id
+        )
+        transaction = await get_transaction_by_uni_id(writer, tid)
+        if not transaction:
+            raise ValueError("Transaction doesn't exist (wtf)")
+        resp = PlayResp(win, play_req.amount * (1 if win else -1), transaction)
+        return await idempotency.store(writer, await render(writer, instance, resp))
+
+    return await ledger.submit(settle)
+
+
+@protected_router.post("/play_coinflip/{game_id}", response_model=PlayResp)
+async def conflip_game(
+    conn: Annotated[DB, Depends(get_conn)],
+    ledger: Annotated[LedgerWriter, Depends(get_ledger)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
+    user_id: Annotated[int, Depends(get_user)],
+    game_id: str,
+    play_req: CoinFlipReq,
+) -> PlayResp | Response:
+    if (replay := await idempotency.replay(conn)) is not None:
+        return replay
+
+    async def render(_: DB, __: GameInstance, resp: PlayResp) -> PlayResp:
+        return resp
+
+    return await _play_coinflip(conn, ledger, idempotency, user_id, game_id, play_req, render)
+
+
+@protected_router.post("/coinflip", response_model=QuickPlayResp)
+async def quick_coinflip_game(
+    conn: Annotated[DB, Depends(get_conn)],
+    ledger: Annotated[LedgerWriter, Depends(get_ledger)],
+    game_pool: Annotated[GameInstancePool, Depends(get_game_pool)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
+    user_id: Annotated[int, Depends(get_user)],
+    play_req: QuickCoinFlipReq,
+) -> QuickPlayResp | Response:
+    """
+    Play a game handed out earlier and get the next one in the same response.
+
+    The commitment still comes before the client secret: ``game_id`` must be a game
+    whose hash the client already received, from ``/init`` or from ``next_game`` of
+    a previous play, and picked its client secret after. Keeping the returned
+    ``next_game`` for the following play makes every play after the first a single
+    request.
+    """
+    if (replay := await idempotency.replay(conn)) is not None:
+        return replay
+
+    async def render(writer: DB, instance: GameInstance, resp: PlayResp) -> QuickPlayResp:
+        # Claimed once the play has settled, so a rejected play or a replay burns no
+        # instance, and stored with the response so a replay hands out the same one
+        next_game = await game_pool.claim(writer)
+        return QuickPlayResp(
+            resp.win,
+            resp.user_net_delta,
+            resp.transaction,
+            instance.game_hash,
+            InitResp(next_game.game_id, next_game.game_hash),
+        )
+
+    return await _play_coinflip(
+        conn, ledger, idempotency, user_id, play_req.game_id, play_req, render
+    )
+
+
+@protected_router.post("/play_coinflip_batch", response_model=BatchPlayResp)
+async def batch_coinflip_game(
+    conn: Annotated[DB, Depends(get_conn)],
+    ledger: Annotated[LedgerWriter, Depends(get_ledger)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
+    user_id: Annotated[int, Depends(get_user)],
+    batch_req: BatchCoinFlipReq,
+) -> BatchPlayResp | Response:
+    """
+    Play up to ``MAX_BATCH_GAMES`` coinflips at once. The holder must be able to
+    cover every stake, and all games are settled together in one ledger write:
+    either every game is played or none is.
+    """
+    if (replay := await idempotency.replay(conn)) is not None:
+        return replay
+    games = batch_req.games
+    if not games or len(games) > MAX_BATCH_GAMES:
+        raise HTTPException(422, f"A batch must contain between 1 and {MAX_BATCH_GAMES} games")
+    if any(game.amount <= 0 for game in games):
+        raise HTTPException(422, "Every bet must be a positive amount")
+    if len({game.game_id for game in games}) != len(games):
+        raise HTTPException(400, "The same game cannot be played twice in a batch")
+    if not await user_exist(conn, user_id):
+        raise HTTPException(404, "User not found")
+
+    instances = [await _handle_game(conn, game.game_id) for game in games]
+    holder_id = (await get_db_user(conn, user_id)).holder_id
+    total_stake = sum(game.amount for game in games)
+    if await get_holder_coin_balance(conn, holder_id, batch_req.coin_id) < total_stake:
+        raise HTTPException(403, "Attempt to gamble more than what you have")
+
+    run_secrets = generate_run_secrets(
+        (instance.game_secret, game.client_secret) for instance, game in zip(instances, games)
     )
-    return PlayResp(win, play_req.amount * (1 if win else -1), transaction)
+    plays = [
+        (
+            instance,
+            CoinFlipReq(game.client_secret, game.amount, batch_req.coin_id, game.side),
+            Random(secret).randint(0, 1) == 0,
+        )
+        for instance, game, secret in zip(instances, games, run_secrets)
+    ]
+
+    async def settle(writer: DB) -> BatchPlayResp | Response:
+        if (replay := await idempotency.replay(writer)) is not None:
+            return replay
+        for instance, _, _ in plays:
+            try:
+                _ = await mark_game_instance_completed(writer, instance.game_id)
+            except ValueError:
+                raise HTTPException(400, f"The game {instance.game_id} have already been played")
+        if await get_holder_coin_balance(writer, holder_id, batch_req.coin_id) < total_stake:
+            raise HTTPException(403, "Attempt to gamble more than what you have")
+        tids = [
+            await gamble_handler(
+                writer, win, user_id, play_req, instance.game_secret, play_req.client_secret, instance.game_id
+            )
+            for instance, play_req, win in plays
+        ]
+        transactions = await get_transactions_by_uni_ids(writer, tids)
+        results = [
+            BatchGameResult(
+                instance.game_id,
+                win,
+                play_req.amount * (1 if win else -1),
+                transactions[tid],
+            )
+            for (instance, play_req, win), tid in zip(plays, tids)
+        ]
+        return await idempotency.store(
+            writer, BatchPlayResp(sum(r.user_net_delta for r in results), results)
+        )
+
+    return await ledger.submit(settle)
 
 
 game_app.include_router(protected_router)
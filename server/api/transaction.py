@@ -1,49 +1,89 @@
 from typing import Annotated, TypedDict
 
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
+import asqlite
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Response
 
 from database.transact import (
+    TX_PREFIX,
     get_transaction as db_get_transaction,
     get_transactions_by_partial_tx,
     get_transaction_by_tx,
 )
 from database.transact import transact, InsufficientBalanceError
 from database.account import get_holder_account, get_account_by_id
+from database.checkpoint import get_inclusion_proof
 from database.user import UserNotExistError, get_user as db_get_user
 from helper.jwt_helper import get_user
-from helper.db_helper import DB, get_tx_conn
-from schema.db import Transaction
+from helper.db_helper import DB, get_conn, get_read_conn, get_read_pool, read_snapshot
+from helper.idempotency import Idempotency, get_idempotency
+from helper.json_response import JSONRoute, dump_json
+from helper.ledger_writer import LedgerWriter, get_ledger
+from helper.response_cache import transaction_responses
+from schema.db import InclusionProof, Transaction
 
 tr_app = FastAPI()
 
-public_router = APIRouter()
-protected_router = APIRouter(dependencies=[Depends(get_user)])
+public_router = APIRouter(route_class=JSONRoute)
+protected_router = APIRouter(dependencies=[Depends(get_user)], route_class=JSONRoute)
 
 
-@public_router.get("/get/{transaction_id}")
+@public_router.get("/get/{transaction_id}", response_model=Transaction)
 async def get_transaction(
-    conn: Annotated[DB, Depends(get_tx_conn)], transaction_id: str
-) -> Transaction:
+    pool: Annotated[asqlite.Pool, Depends(get_read_pool)],
+    transaction_id: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Look a transaction up by uni id, full tx hash or a unique tx prefix of at least
+    6 characters. Lookups by id or full hash never change their answer, so they are
+    served from an in-process cache with a strong ETag and as immutable.
+    """
     try:
-        uni_id = int(transaction_id)
-        result = await db_get_transaction(conn, uni_id)
-        if result:
-            return result
+        key: int | str = int(transaction_id)
     except ValueError:
-        pass
+        key = transaction_id
+        if not TX_PREFIX.fullmatch(transaction_id.lower()):
+            raise HTTPException(404, "The requested transaction cannot be found")
+    if cached := transaction_responses.get(key):
+        return cached.response(if_none_match)
+
+    async with read_snapshot(pool) as conn:
+        if isinstance(key, int):
+            result = await db_get_transaction(conn, key)
+            if result:
+                return transaction_responses.put(result).response(if_none_match)
+
+        if len(transaction_id) >= 6:
+            full_match = await get_transaction_by_tx(conn, transaction_id)
+            if full_match:
+                return transaction_responses.put(full_match).response(if_none_match)
+            partial_matches = await get_transactions_by_partial_tx(conn, transaction_id)
+            if len(partial_matches) == 1:
+                # A prefix may become ambiguous later, so this answer is not cacheable
+                return Response(
+                    dump_json(partial_matches[0], Transaction),
+                    media_type="application/json",
+                    headers={"Cache-Control": "no-cache"},
+                )
+            if len(partial_matches) > 1:
+                raise HTTPException(409, "Transaction ID is ambiguous and matches multiple transactions.")
 
+    raise HTTPException(404, "The requested transaction cannot be found")
 
-    if isinstance(transaction_id, str) and len(transaction_id) >= 6:
-        full_match = await get_transaction_by_tx(conn, transaction_id)
-        if full_match:
-            return full_match
-        partial_matches = await get_transactions_by_partial_tx(conn, transaction_id)
-        if len(partial_matches) == 1:
-            return partial_matches[0]
-        if len(partial_matches) > 1:
-            raise HTTPException(409, "Transaction ID is ambiguous and matches multiple transactions.")
+@public_router.get("/proof/{tx}")
+async def get_transaction_proof(
+    conn: Annotated[DB, Depends(get_read_conn)], tx: str
+) -> InclusionProof:
+    """
+    Merkle inclusion proof of a transaction in its sealed chain block. Check it by
+    folding ``path`` from ``SHA3_512("leaf::" + tx)`` with ``SHA3_512("node::" + left
+    + "::" + right)`` and comparing with ``checkpoint.root``.
+    """
+    proof = await get_inclusion_proof(conn, tx)
+    if proof is None:
+        raise HTTPException(404, "Transaction not found or not covered by a checkpoint yet")
+    return proof
 
-    raise HTTPException(404, "The requested transaction cannot be found")
 
 class PaySchema(TypedDict):
     src: int
@@ -52,12 +92,17 @@ class PaySchema(TypedDict):
     amount: int
 
 
-@protected_router.post("/pay")
+@protected_router.post("/pay", response_model=Transaction)
 async def pay_transaction(
-    conn: Annotated[DB, Depends(get_tx_conn)],
+    conn: Annotated[DB, Depends(get_conn)],
+    ledger: Annotated[LedgerWriter, Depends(get_ledger)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
     payment_config: PaySchema,
     user: Annotated[int, Depends(get_user)],
-) -> Transaction:
+) -> Transaction | Response:
+    if (replay := await idempotency.replay(conn)) is not None:
+        return replay
+
     try:
         user_obj = await db_get_user(conn, user)
     except UserNotExistError:
@@ -73,18 +118,24 @@ async def pay_transaction(
     except ValueError:
         raise HTTPException(404, "Destination account not found")
 
-    try:
+    async def pay(writer: DB) -> Transaction | Response:
+        # A retry with the same key may have been queued behind the original
+        if (replay := await idempotency.replay(writer)) is not None:
+            return replay
         tid, _ = await transact(
-            conn,
+            writer,
             payment_config["src"],
             payment_config["dst"],
             payment_config["coin_id"],
             payment_config["amount"],
         )
-        result = await db_get_transaction(conn, tid)
+        result = await db_get_transaction(writer, tid)
         if not result:
             raise HTTPException(500, "Unknown status: cannot get transaction just created")
-        return result
+        return await idempotency.store(writer, result)
+
+    try:
+        return await ledger.submit(pay)
     except InsufficientBalanceError:
         raise HTTPException(422, "Insufficient Balance")
 
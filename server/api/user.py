@@ -1,22 +1,35 @@
 from typing import Annotated, TypedDict
 
-from fastapi import APIRouter, Depends, HTTPException, status, FastAPI
+import asyncio
+
+import asqlite
+from fastapi import APIRouter, Depends, HTTPException, Query, status, FastAPI
+from fastapi.responses import StreamingResponse
 
 from database.user import create_user, get_user as get_db_user, UserNotExistError, user_exist
-from helper.db_helper import DB, get_tx_conn
+from helper.db_helper import (
+    DB,
+    get_conn,
+    get_export_slots,
+    get_read_conn,
+    get_read_pool,
+    read_snapshot,
+)
+from helper.ledger_writer import LedgerWriter, get_ledger
 from helper.jwt_helper import get_user
+from helper.json_response import JSONRoute, dump_json
 from schema.db import User, Transaction
 from database.coin import get_holder_balance
-from database.transact import list_holder_transactions
+from database.transact import iter_holder_transactions, list_holder_transactions
 
 user_app = FastAPI()
 
-public_router = APIRouter()
-protected_router = APIRouter(dependencies=[Depends(get_user)])
+public_router = APIRouter(route_class=JSONRoute)
+protected_router = APIRouter(dependencies=[Depends(get_user)], route_class=JSONRoute)
 
 @public_router.get("/get/{user_id:int}", response_model=User)
 async def handle_get_user(
-    conn: Annotated[DB, Depends(get_tx_conn)], user_id: int
+    conn: Annotated[DB, Depends(get_read_conn)], user_id: int
 ) -> User:
     try:
         user = await get_db_user(conn, user_id)
@@ -28,16 +41,22 @@ async def handle_get_user(
 
 @protected_router.post("/create", response_model=User, status_code=status.HTTP_201_CREATED)
 async def handle_create_user(
-    conn: Annotated[DB, Depends(get_tx_conn)],
+    conn: Annotated[DB, Depends(get_conn)],
+    ledger: Annotated[LedgerWriter, Depends(get_ledger)],
     user_id: Annotated[int, Depends(get_user)],
 ):
+    conflict = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"User with Discord ID {user_id} already have an account.",
+    )
     if await user_exist(conn, user_id):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"User with Discord ID {user_id} already have an account.",
-        )
-    
-    new_user = await create_user(conn, user_id)
+        raise conflict
+
+    try:
+        new_user = await ledger.submit(lambda writer: create_user(writer, user_id))
+    except ValueError:
+        # Lost a race with another create for the same user
+        raise conflict
     return new_user
 
 class ProfileData(TypedDict):
@@ -47,13 +66,75 @@ class ProfileData(TypedDict):
 
 @protected_router.get("/profile/@me", response_model=ProfileData)
 async def get_user_profile(
-    conn: Annotated[DB, Depends(get_tx_conn)],
+    conn: Annotated[DB, Depends(get_read_conn)],
     user_id: Annotated[int, Depends(get_user)],
 ) -> ProfileData:
-    user = await get_db_user(conn, user_id)
+    try:
+        user = await get_db_user(conn, user_id)
+    except UserNotExistError:
+        raise HTTPException(404, "User doesn't exist")
     balance = {c.unique_name: b for c, b in (await get_holder_balance(conn, user.holder_id)).items()}
     transactions = await list_holder_transactions(conn, user.holder_id, limit=10)
     return {"balance": balance, "transactions": transactions}
 
+
+class HistoryPage(TypedDict):
+    transactions: list[Transaction]
+    next_cursor: int | None  # pass as before_id for older transactions
+    prev_cursor: int | None  # pass as after_id for newer transactions
+
+
+@protected_router.get("/history/@me", response_model=HistoryPage)
+async def get_user_history(
+    conn: Annotated[DB, Depends(get_read_conn)],
+    user_id: Annotated[int, Depends(get_user)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    before_id: int | None = None,
+    after_id: int | None = None,
+) -> HistoryPage:
+    try:
+        user = await get_db_user(conn, user_id)
+    except UserNotExistError:
+        raise HTTPException(404, "User doesn't exist")
+    transactions = await list_holder_transactions(
+        conn, user.holder_id, limit=limit, before_id=before_id, after_id=after_id
+    )
+    return {
+        "transactions": transactions,
+        "next_cursor": transactions[-1].id if len(transactions) == limit else None,
+        "prev_cursor": transactions[0].id if transactions else after_id,
+    }
+
+
+@protected_router.get("/history/@me/export")
+async def export_user_history(
+    pool: Annotated[asqlite.Pool, Depends(get_read_pool)],
+    slots: Annotated[asyncio.Semaphore, Depends(get_export_slots)],
+    user_id: Annotated[int, Depends(get_user)],
+) -> StreamingResponse:
+    """
+    The caller's whole history as NDJSON, one transaction per line, oldest first.
+    It is streamed in batches from one read-only snapshot, so an export of any size
+    uses constant memory and never holds up the ledger writer. Exports wait for one
+    of the ``DB_EXPORT_SLOTS`` before taking a read connection, so slow clients can
+    only hold a few of them.
+    """
+    async with read_snapshot(pool) as conn:
+        try:
+            user = await get_db_user(conn, user_id)
+        except UserNotExistError:
+            raise HTTPException(404, "User doesn't exist")
+
+    async def lines():
+        async with slots, read_snapshot(pool) as conn:
+            async for batch in iter_holder_transactions(conn, user.holder_id):
+                yield b"".join(dump_json(transaction, Transaction) + b"\n" for transaction in batch)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="history-{user_id}.ndjson"'},
+    )
+
 user_app.include_router(protected_router)
 user_app.include_router(public_router)
@@ -0,0 +1,162 @@
+"""
+Microbenchmark for decoding transaction history rows.
+
+Materialises a 10k row history page from a scratch database and reports the
+per-row decode cost and the memory held by the decoded page, for the shared
+``decode_transaction`` and for the keyword-argument mapping it replaced.
+
+Usage (from the ``server`` directory)::
+
+    python -m bench.decode_rows [rows]
+"""
+
+import sqlite3
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from database.transact import decode_transaction, select_transactions
+from helper.db_helper import SCHEMA_PATH, list_migrations
+
+
+@dataclass(frozen=True)
+class _DictReward:
+    id: int
+    reason: str
+
+
+@dataclass(frozen=True)
+class _DictGame:
+    id: int
+    server_secret: str
+    client_secret: str
+    game_instance: str
+    user_win: bool
+
+
+@dataclass(frozen=True)
+class _DictTransaction:
+    id: int
+    tx: str
+    src: int
+    dst: int
+    coin_id: int
+    coin_unique_name: str
+    coin_read_name: str
+    amount: int
+    kind: str
+    reason: str
+    inner_hash: str
+    create_dt: str
+    transact_data: str
+    reward: Optional[_DictReward]
+    game: Optional[_DictGame]
+
+
+def _legacy_decode(row: Sequence[Any]) -> _DictTransaction:
+    """The per-function mapping used before decode_transaction existed."""
+    (
+        uid, src, dst, coin_id, coin_unique, coin_read, amount, kind, reason,
+        inner_hash, create_dt, transact_data, reward_id, reward_reason, game_id,
+        server_secret, client_secret, game_instance, user_win, tx,
+    ) = row
+    reward_dc = (
+        _DictReward(id=reward_id, reason=reward_reason) if reward_id is not None else None
+    )
+    game_dc = (
+        _DictGame(
+            id=game_id,
+            server_secret=server_secret,
+            client_secret=client_secret,
+            user_win=bool(user_win),
+            game_instance=game_instance,
+        )
+        if game_id is not None
+        else None
+    )
+    return _DictTransaction(
+        id=uid,
+        tx=tx,
+        src=src,
+        dst=dst,
+        coin_id=coin_id,
+        coin_unique_name=coin_unique,
+        coin_read_name=coin_read,
+        amount=amount,
+        kind=kind,
+        reason=reason,
+        inner_hash=inner_hash,
+        create_dt=create_dt,
+        transact_data=transact_data,
+        reward=reward_dc,
+        game=game_dc,
+    )
+
+
+def seed(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    _ = conn.executescript(SCHEMA_PATH.read_text())
+    for _, path in list_migrations():
+        _ = conn.executescript(path.read_text())
+    _ = conn.execute("BEGIN")
+    _ = conn.executemany(
+        "INSERT INTO uni_transact(id, src, dst, coin_id, amount, kind, inner_hash) "
+        "VALUES (?, 0, -1, 0, ?, ?, ?)",
+        (
+            (i, i, "game" if i % 2 else "none", f"{i:0128x}")
+            for i in range(1, rows + 1)
+        ),
+    )
+    _ = conn.executemany(
+        "INSERT INTO transact_chain(tx, transact_id) VALUES (?, ?)",
+        ((f"{i:0128x}", i) for i in range(1, rows + 1)),
+    )
+    _ = conn.executemany(
+        "INSERT INTO game_instance(game_id, game_secret, game_hash) VALUES (?, '', '')",
+        ((f"g{i}",) for i in range(1, rows + 1, 2)),
+    )
+    _ = conn.executemany(
+        "INSERT INTO game_transact(ref_id, server_secret, client_secret, game_instance, user_win) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((i, f"s{i}", f"c{i}", f"g{i}", i % 4 == 1) for i in range(1, rows + 1, 2)),
+    )
+    _ = conn.execute("COMMIT")
+    return conn
+
+
+def measure(name: str, decode: Callable[[Sequence[Any]], object], rows: list[sqlite3.Row]) -> None:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        _ = [decode(row) for row in rows]
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    page = [decode(row) for row in rows]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+
+    print(
+        f"{name:<22} {best / len(rows) * 1e9:8.0f} ns/row"
+        f"  {held / 1024 / 1024:7.2f} MiB held  {held / len(rows):6.0f} B/row"
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    conn = seed(count)
+    rows = conn.execute(
+        select_transactions("1", "ORDER BY u.id DESC LIMIT ?"), (count,)
+    ).fetchall()
+    print(f"Decoding {len(rows)} rows")
+    measure("kwargs (legacy)", _legacy_decode, rows)
+    measure("decode_transaction", decode_transaction, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Microbenchmark for the SHA3-512 backends in ``crypto.hashing``.
+
+Hashes synthetic ``transact_data`` strings shaped like the generated column of
+``uni_transact`` and reports the throughput of each backend called once per
+input, and of ``sha3_512_hex_many`` for the whole batch. The pure-Python backend
+is timed on a sample and its total extrapolated, hashing a million inputs with
+it takes about half an hour.
+
+Usage (from the ``server`` directory)::
+
+    python -m bench.hashing [inputs] [python_sample]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+
+from crypto.hashing import BACKENDS, sha3_512_hex, sha3_512_hex_many
+
+
+def transact_data(count: int) -> list[str]:
+    return [
+        f"{i % 997}--{i % 991}--0--{i * 7 % 10_000}--game--{i:0128x}--2025-01-01 00:00:00--Game settlement"
+        for i in range(count)
+    ]
+
+
+def measure(name: str, run: Callable[[list[str]], object], inputs: list[str], total: int) -> None:
+    start = time.perf_counter()
+    _ = run(inputs)
+    elapsed = time.perf_counter() - start
+    projected = elapsed * total / len(inputs)
+    note = "" if len(inputs) == total else f"  (extrapolated from {len(inputs):,})"
+    print(
+        f"{name:<24} {projected:8.2f} s  {total / projected:12,.0f} hashes/s"
+        f"  {projected / total * 1e9:8.0f} ns/hash{note}"
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    inputs = transact_data(count)
+    expected = sha3_512_hex_many(inputs[:100])
+    for backend in BACKENDS.values():
+        assert [backend(data.encode()) for data in inputs[:100]] == expected
+
+    print(f"SHA3-512 of {count:,} transact_data strings")
+    for name, backend in BACKENDS.items():
+        subset = inputs[: min(sample, count)] if name == "python" else inputs
+        measure(name, lambda batch: [backend(data.encode()) for data in batch], subset, count)
+    measure("sha3_512_hex", lambda batch: [sha3_512_hex(data) for data in batch], inputs, count)
+    measure("sha3_512_hex_many", sha3_512_hex_many, inputs, count)
+
+
+if __name__ == "__main__":
+    main()
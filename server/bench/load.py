@@ -0,0 +1,252 @@
+"""
+Load test for the whole server.
+
+Starts ``main.app`` under uvicorn against a temporary database, seeds users with
+``create_user`` and drives a mixed workload from concurrent clients for a fixed
+time: payments, coinflips (``/game/init`` once, then ``/game/coinflip`` with the
+returned next game), profile reads and transaction lookups. Reports latency
+percentiles and throughput per operation, how many requests failed on
+``SQLITE_BUSY`` and how much the database grew.
+
+The server runs on a thread of this process, so the clients share its CPU; compare
+runs on the same machine with the same arguments rather than reading absolute
+numbers.
+
+Usage (from the ``server`` directory)::
+
+    python -m bench.load [--users N] [--concurrency N] [--duration S]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import aiohttp
+import asqlite
+import uvicorn
+
+for name, value in {
+    "JWT_SECRET": "bench-secret-bench-secret-bench-secret",
+    "DISCORD_CLIENT_ID": "0",
+    "DISCORD_CLIENT_SECRET": "bench",
+    "DISCORD_REDIRECT_URI": "http://localhost/auth/discord/callback",
+}.items():
+    _ = os.environ.setdefault(name, value)
+
+from crypto.jwt_handler import JWTHandler
+from database.user import create_user
+from helper import db_helper
+from main import app
+
+# Operation name and its share of the workload
+WORKLOAD = {"pay": 0.25, "coinflip": 0.25, "profile": 0.3, "transaction": 0.2}
+
+
+class BusyCounter(logging.Handler):
+    """
+    Counts requests the server failed with SQLITE_BUSY ("database is locked"), from
+    the "Exception in ASGI application" uvicorn logs on ``uvicorn.error`` for each.
+    That logger does not propagate to the root logger.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.exc_info and isinstance(record.exc_info[1], sqlite3.OperationalError):
+            message = str(record.exc_info[1])
+            if "locked" in message or "busy" in message:
+                self.count += 1
+
+
+def db_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.parent.glob(f"{path.name}*"))
+
+
+async def seed(path: Path, users: int) -> list[int]:
+    """Create the database and ``users`` users, returning the account of each."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    accounts: list[int] = []
+    async with asqlite.connect(path.as_posix()) as conn:
+        _ = await conn.executescript(db_helper.SCHEMA_PATH.read_text())
+        _ = await db_helper.migrate(conn)
+        _ = await conn.execute("BEGIN IMMEDIATE;")
+        for user_id in range(1, users + 1):
+            user = await create_user(conn, user_id)  # pyright: ignore[reportArgumentType]
+            accounts.append(user.accounts[0].id)
+        _ = await conn.execute("COMMIT;")
+    return accounts
+
+
+class Client:
+    """One simulated bot user issuing the workload against the server."""
+
+    def __init__(self, session: aiohttp.ClientSession, user_id: int, token: str, accounts: list[int]):
+        self.session = session
+        self.user_id = user_id
+        self.headers = {"X-API-KEY": token}
+        self.accounts = accounts
+        self.next_game: str | None = None
+        self.last_transaction = 1
+
+    async def pay(self) -> int:
+        src = self.accounts[self.user_id - 1]
+        dst = random.choice(self.accounts)
+        if dst == src:
+            dst = self.accounts[self.user_id % len(self.accounts)]
+        body = {"src": src, "dst": dst, "coin_id": 0, "amount": 1}
+        async with self.session.post("/transaction/pay", json=body, headers=self.headers) as resp:
+            if resp.ok:
+                self.last_transaction = (await resp.json())["id"]
+            return resp.status
+
+    async def coinflip(self) -> int:
+        if self.next_game is None:
+            async with self.session.post("/game/init", headers=self.headers) as resp:
+                if not resp.ok:
+                    return resp.status
+                self.next_game = (await resp.json())["game_id"]
+        body = {
+            "game_id": self.next_game,
+            "client_secret": os.urandom(16).hex(),
+            "amount": 1,
+            "coin_id": 0,
+            "side": random.random() < 0.5,
+        }
+        self.next_game = None
+        async with self.session.post("/game/coinflip", json=body, headers=self.headers) as resp:
+            if resp.ok:
+                data = await resp.json()
+                self.next_game = data["next_game"]["game_id"]
+                self.last_transaction = data["transaction"]["id"]
+            return resp.status
+
+    async def profile(self) -> int:
+        async with self.session.get("/user/profile/@me", headers=self.headers) as resp:
+            _ = await resp.read()
+            return resp.status
+
+    async def transaction(self) -> int:
+        transaction_id = random.randint(1, self.last_transaction)
+        async with self.session.get(f"/transaction/get/{transaction_id}") as resp:
+            _ = await resp.read()
+            return resp.status
+
+
+async def drive(
+    base_url: str, accounts: list[int], concurrency: int, duration: float
+) -> tuple[dict[str, list[float]], Counter[tuple[str, int]], float]:
+    handler = JWTHandler(os.environ["JWT_SECRET"])
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter[tuple[str, int]] = Counter()
+    names = list(WORKLOAD)
+    weights = list(WORKLOAD.values())
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(base_url, connector=connector) as session:
+        clients = [
+            Client(session, user_id, handler.create_user(user_id), accounts)
+            for user_id in range(1, len(accounts) + 1)
+        ]
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def worker(index: int) -> None:
+            while time.perf_counter() < deadline:
+                client = clients[(index + random.randrange(len(clients))) % len(clients)]
+                name = random.choices(names, weights)[0]
+                begin = time.perf_counter()
+                status = await getattr(client, name)()
+                latencies[name].append(time.perf_counter() - begin)
+                statuses[name, status] += 1
+
+        _ = await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float, float]:
+    if len(samples) < 2:
+        only = samples[0] if samples else 0.0
+        return only, only, only
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def report(
+    latencies: dict[str, list[float]], statuses: Counter[tuple[str, int]], elapsed: float
+) -> None:
+    print(f"{'operation':<12} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    everything: list[float] = []
+    for name in WORKLOAD:
+        samples = latencies.get(name, [])
+        everything.extend(samples)
+        p50, p95, p99 = _percentiles(samples)
+        codes = ", ".join(f"{code}x{count}" for (op, code), count in sorted(statuses.items()) if op == name)
+        print(
+            f"{name:<12} {len(samples):>9} {len(samples) / elapsed:>9.1f}"
+            f" {p50 * 1e3:>8.2f} {p95 * 1e3:>8.2f} {p99 * 1e3:>8.2f}  {codes}"
+        )
+    p50, p95, p99 = _percentiles(everything)
+    print(
+        f"{'total':<12} {len(everything):>9} {len(everything) / elapsed:>9.1f}"
+        f" {p50 * 1e3:>8.2f} {p95 * 1e3:>8.2f} {p99 * 1e3:>8.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument("--users", type=int, default=100)
+    _ = parser.add_argument("--concurrency", type=int, default=32)
+    _ = parser.add_argument("--duration", type=float, default=20.0)
+    _ = parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_helper.DB_PATH = Path(tmp) / "gamba.db"
+        accounts = asyncio.run(seed(db_helper.DB_PATH, args.users))
+        size_before = db_size(db_helper.DB_PATH)
+
+        server = uvicorn.Server(
+            uvicorn.Config(app, port=args.port, log_level="warning", access_log=False)
+        )
+        # After the config, which resets the handlers of uvicorn's loggers
+        busy = BusyCounter()
+        logging.getLogger("uvicorn.error").addHandler(busy)
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        print(
+            f"{args.users} users, {args.concurrency} concurrent clients, {args.duration:.0f}s"
+        )
+        try:
+            latencies, statuses, elapsed = asyncio.run(
+                drive(f"http://127.0.0.1:{args.port}", accounts, args.concurrency, args.duration)
+            )
+        finally:
+            server.should_exit = True
+            thread.join()
+
+        report(latencies, statuses, elapsed)
+        size_after = db_size(db_helper.DB_PATH)
+        print(f"SQLITE_BUSY failures: {busy.count}")
+        print(
+            f"Database: {size_before / 1024:.0f} KiB -> {size_after / 1024:.0f} KiB"
+            f" (+{(size_after - size_before) / 1024:.0f} KiB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Microbenchmark for serialising API responses.
+
+Decodes 100-row transaction pages from a scratch database and reports
+the cost of turning one page (and a page of 100 accounts) into response bytes:
+FastAPI's default path for a route with a response model (validate, dump to
+Python objects, ``jsonable_encoder``, ``json.dumps``), ``jsonable_encoder`` on
+the dataclasses directly, and the precompiled serializer ``JSONRoute`` uses.
+
+Usage (from the ``server`` directory)::
+
+    python -m bench.serialize [rows]
+"""
+
+import json
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+
+from bench.decode_rows import seed
+from database.transact import decode_transaction, select_transactions
+from helper.json_response import dump_json, serializer
+from schema.db import Account, Coin, Transaction
+
+PAGE = 100
+
+
+def fastapi_default(value: object, tp: Any) -> bytes:
+    adapter = serializer(tp)
+    content = jsonable_encoder(adapter.dump_python(adapter.validate_python(value), mode="json"))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+
+
+def encoder_only(value: object, tp: Any) -> bytes:
+    return json.dumps(
+        jsonable_encoder(value), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+
+
+def measure(name: str, render: Callable[[object, Any], bytes], pages: list[object], tp: Any) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for page in pages:
+            _ = render(page, tp)
+        best = min(best, time.perf_counter() - start)
+    per_page = best / len(pages)
+    print(f"{name:<24} {per_page * 1e6:9.1f} us/page  {per_page / PAGE * 1e6:7.2f} us/row")
+    return per_page
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    conn = seed(count)
+    rows = conn.execute(
+        select_transactions("1", "ORDER BY u.id DESC LIMIT ?"), (count,)
+    ).fetchall()
+    transactions = [decode_transaction(row) for row in rows]
+    pages: list[object] = [
+        transactions[i : i + PAGE] for i in range(0, len(transactions) - PAGE + 1, PAGE)
+    ]
+    for page in pages[:1]:
+        assert fastapi_default(page, list[Transaction]) == dump_json(page, list[Transaction])
+
+    print(f"Pages of {PAGE} transactions ({len(pages)} pages)")
+    default = measure("fastapi default", fastapi_default, pages, list[Transaction])
+    _ = measure("jsonable_encoder", encoder_only, pages, list[Transaction])
+    fast = measure("JSONRoute", dump_json, pages, list[Transaction])
+    print(f"{'speedup':<24} {default / fast:9.1f}x")
+
+    coins = [Coin(0, "COIN", "Coin"), Coin(1, "GEM", "Gem")]
+    accounts: list[object] = [
+        [Account(i, i, {coin: i * (coin.id + 1) for coin in coins}) for i in range(PAGE)]
+    ] * 20
+    print(f"\nAccount lists of {PAGE} accounts")
+    default = measure("fastapi default", fastapi_default, accounts, list[Account])
+    fast = measure("JSONRoute", dump_json, accounts, list[Account])
+    print(f"{'speedup':<24} {default / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
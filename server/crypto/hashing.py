@@ -0,0 +1,115 @@
+"""
+SHA3-512 hex digests for the transaction chain, game hashes and Merkle trees.
+
+``sha3_512_hex`` and ``sha3_512_hex_many`` use ``hashlib``, falling back to
+``cryptography`` on interpreters built without SHA3 and to the pure-Python Keccak
+below when ``cryptography`` is not installed either. Every backend in
+:data:`BACKENDS` produces the same digests, so rows written with one can be
+verified with another.
+"""
+
+import hashlib
+from collections.abc import Callable, Iterable
+
+type Backend = Callable[[bytes], str]
+
+_MASK = (1 << 64) - 1
+_RATE = 72  # bytes absorbed per permutation for a 512-bit capacity
+_ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+# Rotation of lane (x, y), indexed [x][y]
+_ROTATIONS = (
+    (0, 36, 3, 41, 18),
+    (1, 44, 10, 45, 2),
+    (62, 6, 43, 15, 61),
+    (28, 55, 25, 21, 56),
+    (27, 20, 39, 8, 14),
+)
+# (source lane, destination lane, rotation) of the rho and pi steps, lane (x, y) at x + 5y
+_RHO_PI = tuple(
+    (x + 5 * y, y + 5 * ((2 * x + 3 * y) % 5), _ROTATIONS[x][y])
+    for x in range(5)
+    for y in range(5)
+)
+# (lane, next lane in its row, the one after) of the chi step
+_CHI = tuple((i, i - i % 5 + (i + 1) % 5, i - i % 5 + (i + 2) % 5) for i in range(25))
+
+
+def _keccak_f(state: list[int]) -> list[int]:
+    b = [0] * 25
+    for round_constant in _ROUND_CONSTANTS:
+        c0 = state[0] ^ state[5] ^ state[10] ^ state[15] ^ state[20]
+        c1 = state[1] ^ state[6] ^ state[11] ^ state[16] ^ state[21]
+        c2 = state[2] ^ state[7] ^ state[12] ^ state[17] ^ state[22]
+        c3 = state[3] ^ state[8] ^ state[13] ^ state[18] ^ state[23]
+        c4 = state[4] ^ state[9] ^ state[14] ^ state[19] ^ state[24]
+        d = (
+            c4 ^ (((c1 << 1) | (c1 >> 63)) & _MASK),
+            c0 ^ (((c2 << 1) | (c2 >> 63)) & _MASK),
+            c1 ^ (((c3 << 1) | (c3 >> 63)) & _MASK),
+            c2 ^ (((c4 << 1) | (c4 >> 63)) & _MASK),
+            c3 ^ (((c0 << 1) | (c0 >> 63)) & _MASK),
+        )
+        for src, dst, rotation in _RHO_PI:
+            lane = state[src] ^ d[src % 5]
+            b[dst] = ((lane << rotation) | (lane >> (64 - rotation))) & _MASK
+        state = [b[i] ^ (~b[j] & b[k]) for i, j, k in _CHI]
+        state[0] ^= round_constant
+    return state
+
+
+def python_sha3_512_hex(data: bytes) -> str:
+    """SHA3-512 in pure Python (FIPS 202), for when neither ``hashlib`` nor ``cryptography`` has it."""
+    padded = bytearray(data)
+    padded.append(0x06)
+    padded.extend(bytes(-len(padded) % _RATE))
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for start in range(0, len(padded), _RATE):
+        for i in range(_RATE // 8):
+            offset = start + 8 * i
+            state[i] ^= int.from_bytes(padded[offset : offset + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(lane.to_bytes(8, "little") for lane in state[:8]).hex()
+
+
+BACKENDS: dict[str, Backend] = {"python": python_sha3_512_hex}
+
+try:
+    from cryptography.hazmat.primitives.hashes import Hash, SHA3_512
+except ImportError:
+    pass
+else:
+
+    def cryptography_sha3_512_hex(data: bytes) -> str:
+        h = Hash(SHA3_512())
+        h.update(data)
+        return h.finalize().hex()
+
+    BACKENDS["cryptography"] = cryptography_sha3_512_hex
+
+_hashlib_sha3_512 = getattr(hashlib, "sha3_512", None)
+if _hashlib_sha3_512 is not None:
+
+    def hashlib_sha3_512_hex(data: bytes) -> str:
+        return _hashlib_sha3_512(data).hexdigest()
+
+    BACKENDS["hashlib"] = hashlib_sha3_512_hex
+
+_digest: Backend = BACKENDS.get("hashlib") or BACKENDS.get("cryptography") or python_sha3_512_hex
+
+
+def sha3_512_hex(data: str | bytes) -> str:
+    return _digest(data.encode() if isinstance(data, str) else data)
+
+
+def sha3_512_hex_many(items: Iterable[str | bytes]) -> list[str]:
+    """Digest of each item, in order, for hashing whole batches of rows in one call."""
+    digest = _digest
+    return [digest(item.encode() if isinstance(item, str) else item) for item in items]
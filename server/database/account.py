@@ -24,9 +24,9 @@ SELECT
     coin.read_name AS read_name,
     user_coin.amount AS amount
 FROM account
-RIGHT JOIN user_coin ON user_coin.account_id = account.id
+JOIN user_coin ON user_coin.account_id = account.id
 LEFT JOIN coin ON coin.id = user_coin.coin_id
-WHERE holder_id = ?""",
+WHERE account.holder_id = ?""",
         (holder_id,),
     )
     balance_record: dict[int, dict[Coin, int]] = {}
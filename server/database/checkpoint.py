@@ -0,0 +1,147 @@
+from crypto.hashing import sha3_512_hex, sha3_512_hex_many
+
+from helper.db_helper import DB
+from schema.db import ChainCheckpoint, InclusionProof, ProofStep
+
+CHECKPOINT_BLOCK_SIZE = 1024
+
+
+def leaf_hash(tx: str) -> str:
+    return sha3_512_hex(f"leaf::{tx}")
+
+
+def node_hash(left: str, right: str) -> str:
+    return sha3_512_hex(f"node::{left}::{right}")
+
+
+def merkle_levels(txs: list[str]) -> list[list[str]]:
+    """
+    Every level of the Merkle tree over ``txs``, leaves first and root last. Leaves
+    and inner nodes are hashed with distinct prefixes, and an odd node at the end
+    of a level is carried up unchanged.
+    """
+    levels = [sha3_512_hex_many(f"leaf::{tx}" for tx in txs)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = sha3_512_hex_many(
+            f"node::{level[i]}::{level[i + 1]}" for i in range(0, len(level) - 1, 2)
+        )
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(txs: list[str]) -> str:
+    return merkle_levels(txs)[-1][0]
+
+
+def merkle_path(txs: list[str], index: int) -> list[ProofStep]:
+    path: list[ProofStep] = []
+    for level in merkle_levels(txs)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(ProofStep(level[sibling], sibling < index))
+        index //= 2
+    return path
+
+
+def verify_inclusion(tx: str, path: list[ProofStep], root: str) -> bool:
+    node = leaf_hash(tx)
+    for step in path:
+        node = node_hash(step.sibling, node) if step.left else node_hash(node, step.sibling)
+    return node == root
+
+
+async def _block_txs(conn: DB, first_order_op: int, last_order_op: int) -> list[str]:
+    cur = await conn.execute(
+        "SELECT tx FROM transact_chain WHERE order_op BETWEEN ? AND ? ORDER BY order_op",
+        (first_order_op, last_order_op),
+    )
+    return [row[0] for row in await cur.fetchall()]
+
+
+async def get_latest_checkpoint(conn: DB) -> ChainCheckpoint | None:
+    row = await (
+        await conn.execute(
+            """
+            SELECT block_no, first_order_op, last_order_op, root
+            FROM chain_checkpoint
+            WHERE block_no = (SELECT MAX(block_no) FROM chain_checkpoint)
+            """
+        )
+    ).fetchone()
+    return ChainCheckpoint(*row) if row else None
+
+
+async def seal_checkpoints(
+    conn: DB, block_size: int = CHECKPOINT_BLOCK_SIZE, max_blocks: int | None = None
+) -> list[ChainCheckpoint]:
+    """
+    Store the Merkle root of every complete block of ``block_size`` chain entries
+    not checkpointed yet, or of the first ``max_blocks`` of them. A trailing partial
+    block is left for a later call.
+    """
+    latest = await get_latest_checkpoint(conn)
+    block_no = latest.block_no + 1 if latest else 0
+    after = latest.last_order_op if latest else 0
+    sealed: list[ChainCheckpoint] = []
+    while max_blocks is None or len(sealed) < max_blocks:
+        cur = await conn.execute(
+            "SELECT order_op, tx FROM transact_chain WHERE order_op > ? ORDER BY order_op LIMIT ?",
+            (after, block_size),
+        )
+        rows = await cur.fetchall()
+        if len(rows) < block_size:
+            return sealed
+        checkpoint = ChainCheckpoint(
+            block_no, rows[0][0], rows[-1][0], merkle_root([row[1] for row in rows])
+        )
+        _ = await conn.execute(
+            """
+            INSERT INTO chain_checkpoint(block_no, first_order_op, last_order_op, root)
+            VALUES (?, ?, ?, ?)
+            """,
+            (checkpoint.block_no, checkpoint.first_order_op, checkpoint.last_order_op, checkpoint.root),
+        )
+        sealed.append(checkpoint)
+        block_no += 1
+        after = checkpoint.last_order_op
+    return sealed
+
+
+async def get_inclusion_proof(conn: DB, tx: str) -> InclusionProof | None:
+    """
+    Proof that ``tx`` is in the chain, checkable with :func:`verify_inclusion`
+    against the root of its block alone. ``None`` if the transaction does not
+    exist or its block has not been sealed yet.
+    """
+    row = await (
+        await conn.execute("SELECT order_op FROM transact_chain WHERE tx = ?", (tx,))
+    ).fetchone()
+    if row is None:
+        return None
+    order_op: int = row[0]
+    row = await (
+        await conn.execute(
+            """
+            SELECT block_no, first_order_op, last_order_op, root
+            FROM chain_checkpoint
+            WHERE last_order_op >= ?
+            ORDER BY last_order_op
+            LIMIT 1
+            """,
+            (order_op,),
+        )
+    ).fetchone()
+    if row is None:
+        return None
+    checkpoint = ChainCheckpoint(*row)
+    txs = await _block_txs(conn, checkpoint.first_order_op, checkpoint.last_order_op)
+    index = txs.index(tx)
+    return InclusionProof(tx, order_op, index, checkpoint, merkle_path(txs, index))
+
+
+async def verify_checkpoint(conn: DB, checkpoint: ChainCheckpoint) -> bool:
+    txs = await _block_txs(conn, checkpoint.first_order_op, checkpoint.last_order_op)
+    return merkle_root(txs) == checkpoint.root
@@ -24,14 +24,8 @@ async def get_account_coin_balance(conn: DB, account_id: int, coin_id: int) -> i
 async def get_holder_coin_balance(conn: DB, holder_id: int, coin_id: int) -> int:
     row = await (
         await conn.execute(
-            """
-            SELECT COALESCE(SUM(uc.amount), 0)
-            FROM account a
-            LEFT JOIN user_coin uc
-              ON uc.account_id = a.id AND uc.coin_id = ?
-            WHERE a.holder_id = ?
-            """,
-            (coin_id, holder_id),
+            "SELECT COALESCE((SELECT amount FROM holder_coin WHERE holder_id = ? AND coin_id = ?), 0)",
+            (holder_id, coin_id),
         )
     ).fetchone()
     return int(row[0]) if row else 0
@@ -57,13 +51,10 @@ async def get_account_balance(conn: DB, account_id: int) -> dict[Coin, int]:
 async def get_holder_balance(conn: DB, holder_id: int) -> dict[Coin, int]:
     cur = await conn.execute(
         """
-        SELECT c.id, c.unique_name, c.read_name, COALESCE(SUM(uc.amount), 0) AS total
-        FROM account a
-        LEFT JOIN user_coin uc ON uc.account_id = a.id
-        LEFT JOIN coin c ON c.id = uc.coin_id
-        WHERE a.holder_id = ?
-        GROUP BY c.id, c.unique_name, c.read_name
-        HAVING c.id IS NOT NULL
+        SELECT c.id, c.unique_name, c.read_name, hc.amount
+        FROM holder_coin hc
+        JOIN coin c ON c.id = hc.coin_id
+        WHERE hc.holder_id = ?
         ORDER BY c.id
         """,
         (holder_id,),
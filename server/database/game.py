@@ -5,7 +5,7 @@ from schema.db import Account, Coin, GameInstance
 from helper.db_helper import DB
 from .transact import raw_force_transact, InsufficientBalanceError
 
-from cryptography.hazmat.primitives.hashes import Hash, SHA3_512
+from crypto.hashing import sha3_512_hex, sha3_512_hex_many
 
 
 def _acc_id(val: int | Account) -> int:
@@ -16,14 +16,8 @@ def _coin_id(val: int | Coin) -> int:
     return val if isinstance(val, int) else val.id
 
 
-def _sha3_512_hex(data: str) -> str:
-    h = Hash(SHA3_512())
-    h.update(data.encode())
-    return h.finalize().hex()
-
-
 async def create_game_instance(conn: DB, game_id: str, secret: str) -> GameInstance:
-    hash = _sha3_512_hex(f"{game_id}::{secret}")
+    hash = sha3_512_hex(f"{game_id}::{secret}")
     _ = await conn.execute(
         """
         INSERT INTO game_instance(game_id, game_secret, game_hash, is_used)
@@ -34,6 +28,43 @@ async def create_game_instance(conn: DB, game_id: str, secret: str) -> GameInsta
     return GameInstance(game_id, secret, hash, False)
 
 
+async def create_game_instances(
+    conn: DB, secrets: list[tuple[str, str]]
+) -> list[GameInstance]:
+    """Bulk version of :func:`create_game_instance` for ``(game_id, secret)`` pairs."""
+    hashes = sha3_512_hex_many(f"{game_id}::{secret}" for game_id, secret in secrets)
+    instances = [
+        GameInstance(game_id, secret, game_hash, False)
+        for (game_id, secret), game_hash in zip(secrets, hashes)
+    ]
+    _ = await conn.executemany(
+        """
+        INSERT INTO game_instance(game_id, game_secret, game_hash, is_used)
+        VALUES (?,?,?,?)
+        """,
+        [(i.game_id, i.game_secret, i.game_hash, False) for i in instances],
+    )
+    return instances
+
+
+async def delete_unused_game_instances(conn: DB, game_ids: list[str]) -> int:
+    """Drop the instances in ``game_ids`` that were never played."""
+    cur = await conn.executemany(
+        "DELETE FROM game_instance WHERE game_id = ? AND is_used = 0",
+        [(game_id,) for game_id in game_ids],
+    )
+    return cur.get_cursor().rowcount
+
+
+async def delete_expired_game_instances(conn: DB, max_age: float) -> int:
+    """Drop every instance created more than ``max_age`` seconds ago and never played."""
+    cur = await conn.execute(
+        "DELETE FROM game_instance WHERE is_used = 0 AND create_dt < datetime('now', ?)",
+        (f"-{int(max_age)} seconds",),
+    )
+    return cur.get_cursor().rowcount
+
+
 async def get_game_instance(conn: DB, game_id: str) -> GameInstance | None:
     row = await (
         await conn.execute(
@@ -4,13 +4,7 @@ from asqlite import ProxiedConnection
 from schema.db import Account, Coin
 from .transact import raw_force_transact, InsufficientBalanceError, create_game_transact
 
-from cryptography.hazmat.primitives.hashes import Hash, SHA3_512
-
-
-def _sha3_512_hex(data: str) -> str:
-    h = Hash(SHA3_512())
-    h.update(data.encode())
-    return h.finalize().hex()
+from crypto.hashing import sha3_512_hex
 
 
 def _acc_id(val: int | Account) -> int:
@@ -71,7 +65,7 @@ async def holder_transact(
                 amount=amount,
                 reason=reason_payment,
                 kind=kind,
-                inner_hash="",
+                inner_hash=payment_inner_hash,
             )
             return [(tx_id, tx_data)]
 
@@ -120,14 +114,8 @@ async def get_holder_coin_balance(
 ) -> int:
     row = await (
         await conn.execute(
-            """
-            SELECT COALESCE(SUM(uc.amount), 0)
-            FROM account a
-            LEFT JOIN user_coin uc
-              ON uc.account_id = a.id AND uc.coin_id = ?
-            WHERE a.holder_id = ?
-            """,
-            (coin_id, holder_id),
+            "SELECT COALESCE((SELECT amount FROM holder_coin WHERE holder_id = ? AND coin_id = ?), 0)",
+            (holder_id, coin_id),
         )
     ).fetchone()
     return int(row[0]) if row else 0
@@ -147,7 +135,7 @@ async def game_force_transfer_holder_to_system(
     game_id, game_data = await create_game_transact(
         conn, server_secret, client_secret, user_win, game_instance
     )
-    inner_hash = _sha3_512_hex(game_data)
+    inner_hash = sha3_512_hex(game_data)
 
     uni_id = (await holder_transact(
         conn,
@@ -0,0 +1,41 @@
+from helper.db_helper import DB
+
+
+class IdempotencyKeyReusedError(ValueError): ...
+
+
+async def get_idempotent_response(
+    conn: DB, user_id: int, key: str, request_hash: str, now: int
+) -> str | None:
+    """
+    Stored response for ``key``, or ``None`` if there is none or it has expired.
+    Raises :class:`IdempotencyKeyReusedError` if the key was used for a different request.
+    """
+    row = await (
+        await conn.execute(
+            """
+            SELECT request_hash, response FROM idempotency_key
+            WHERE user_id = ? AND key = ? AND expires_at > ?
+            """,
+            (user_id, key, now),
+        )
+    ).fetchone()
+    if row is None:
+        return None
+    if row[0] != request_hash:
+        raise IdempotencyKeyReusedError(f"Idempotency key {key} was used for a different request")
+    return row[1]
+
+
+async def store_idempotent_response(
+    conn: DB, user_id: int, key: str, request_hash: str, response: str, now: int, ttl: int
+) -> None:
+    # Expired keys are dropped as new ones come in, so the table stays at one TTL of traffic
+    _ = await conn.execute("DELETE FROM idempotency_key WHERE expires_at <= ?", (now,))
+    _ = await conn.execute(
+        """
+        INSERT INTO idempotency_key(user_id, key, request_hash, response, expires_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (user_id, key, request_hash, response, now + ttl),
+    )
@@ -0,0 +1,23 @@
+from helper.db_helper import DB
+
+
+async def insert_oauth_state(conn: DB, state: str, redirect: str, expires_at: float) -> None:
+    _ = await conn.execute(
+        "INSERT INTO oauth_state(state, redirect, expires_at) VALUES (?, ?, ?)",
+        (state, redirect, expires_at),
+    )
+
+
+async def pop_oauth_state(conn: DB, state: str) -> tuple[str, float] | None:
+    # Deleting and reading in one statement lets only one worker consume a state
+    row = await (
+        await conn.execute(
+            "DELETE FROM oauth_state WHERE state = ? RETURNING redirect, expires_at", (state,)
+        )
+    ).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+async def delete_expired_oauth_states(conn: DB, now: float) -> int:
+    cur = await conn.execute("DELETE FROM oauth_state WHERE expires_at <= ?", (now,))
+    return cur.get_cursor().rowcount
@@ -1,7 +1,9 @@
-from typing import Literal, overload
+import re
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Literal, overload
 
 from schema.db import Account, Coin, Transaction, Game, Reward
-from cryptography.hazmat.primitives.hashes import Hash, SHA3_512
+from crypto.hashing import sha3_512_hex
 
 from asqlite import ProxiedConnection
 
@@ -17,10 +19,58 @@ def _coin_id(val: int | Coin) -> int:
     return val if isinstance(val, int) else val.id
 
 
-def _sha3_512_hex(data: str) -> str:
-    h = Hash(SHA3_512())
-    h.update(data.encode())
-    return h.finalize().hex()
+GENESIS_TX = "0" * 128
+# A tx hash or a prefix of one, lowercase hex SHA3-512
+TX_PREFIX = re.compile(r"[0-9a-f]{1,128}")
+_HEX_DIGITS = "0123456789abcdef"
+
+
+class ChainTip:
+    """
+    Process-wide cache of the latest ``transact_chain.tx``.
+
+    Writers hold the SQLite write lock while they extend the chain, so the cached
+    tip is only ever read and advanced by the current writer. Other processes on
+    the same database (several workers) extend the chain too, so before the tip is
+    used its ``order_op`` is checked against the last stored one, a lookup of the
+    largest rowid, and the tip is reloaded if another process moved it. The tip must
+    be invalidated whenever a write transaction is rolled back, since it may point
+    at a row that no longer exists; the next writer then reloads it.
+    """
+
+    def __init__(self):
+        self._order_op: int | None = None
+        self._tx: str | None = None
+
+    async def load(self, conn: ProxiedConnection) -> str:
+        row = await (
+            await conn.execute(
+                "SELECT order_op, tx FROM transact_chain ORDER BY order_op DESC LIMIT 1"
+            )
+        ).fetchone()
+        self._order_op, self._tx = (row[0], row[1]) if row else (0, GENESIS_TX)
+        return self._tx
+
+    async def get(self, conn: ProxiedConnection) -> str:
+        if self._tx is None:
+            return await self.load(conn)
+        row = await (
+            await conn.execute("SELECT coalesce(max(order_op), 0) FROM transact_chain")
+        ).fetchone()
+        if row[0] != self._order_op:
+            return await self.load(conn)
+        return self._tx
+
+    def set(self, order_op: int, tx: str) -> None:
+        self._order_op = order_op
+        self._tx = tx
+
+    def invalidate(self) -> None:
+        self._order_op = None
+        self._tx = None
+
+
+chain_tip = ChainTip()
 
 
 async def raw_force_transact(
@@ -50,6 +100,16 @@ async def raw_force_transact(
         ),
         (-amount, src, coin, -amount, src, coin),
     )
+    # Holder totals, so holder balance reads are a primary key lookup
+    for account_id, delta in ((dst, amount), (src, -amount)):
+        _ = await conn.execute(
+            (
+                "INSERT INTO holder_coin(holder_id, coin_id, amount) "
+                "SELECT holder_id, ?, ? FROM account WHERE id = ? "
+                "ON CONFLICT (holder_id, coin_id) DO UPDATE SET amount = amount + excluded.amount"
+            ),
+            (coin, delta, account_id),
+        )
 
     # Create universal transaction and fetch id + transact_data
     transact_row = await conn.execute(
@@ -64,25 +124,19 @@ async def raw_force_transact(
     transact_data: str = row[1]
 
     # Compute self-hash of transact_data
-    self_hash = _sha3_512_hex(transact_data)
+    self_hash = sha3_512_hex(transact_data)
 
     # Build chain hash by combining previous tx hash with this self-hash
-    last_tx = await conn.execute(
-        'SELECT tx FROM transact_chain ORDER BY "order" DESC LIMIT 1'
-    )
-    last_row = await last_tx.fetchone()
-    last_tx_hash: str
-    if last_row:
-        last_tx_hash = last_row[0]
-    else:
-        last_tx_hash = "0" * 128
-
-    new_tx = _sha3_512_hex(f"{last_tx_hash}::{self_hash}")
+    last_tx_hash = await chain_tip.get(conn)
+    new_tx = sha3_512_hex(f"{last_tx_hash}::{self_hash}")
 
-    _ = await conn.execute(
-        "INSERT INTO transact_chain(tx, transact_id) VALUES (?, ?)",
-        (new_tx, transact_id),
-    )
+    chain_row = await (
+        await conn.execute(
+            "INSERT INTO transact_chain(tx, transact_id) VALUES (?, ?) RETURNING order_op",
+            (new_tx, transact_id),
+        )
+    ).fetchone()
+    chain_tip.set(chain_row[0], new_tx)
     return transact_id, transact_data
 
 
@@ -177,7 +231,7 @@ async def reward_force_transfer(
     uni_reason: str = "Reward payout",
 ) -> tuple[int, int]:
     reward_id, reward_data = await create_reward_transact(conn, reward_reason)
-    inner_hash = _sha3_512_hex(reward_data)
+    inner_hash = sha3_512_hex(reward_data)
 
     uni_id, _ = await raw_force_transact(
         conn,
@@ -212,7 +266,7 @@ async def game_force_transfer(
     game_id, game_data = await create_game_transact(
         conn, server_secret, client_secret, user_win, game_instance
     )
-    inner_hash = _sha3_512_hex(game_data)
+    inner_hash = sha3_512_hex(game_data)
 
     uni_id, _ = await raw_force_transact(
         conn,
@@ -232,51 +286,91 @@ async def game_force_transfer(
     return uni_id, game_id
 
 
-async def list_account_transactions(
-    conn: ProxiedConnection,
-    account: int | Account,
-    limit: int = 100,
-    offset: int = 0,
-) -> list[Transaction]:
-    acc_id = _acc_id(account)
-    cur = await conn.execute(
-        """
-        SELECT
-            u.id,
-            u.src,
-            u.dst,
-            u.coin_id,
-            c.unique_name,
-            c.read_name,
-            u.amount,
-            u.kind,
-            u.reason,
-            u.inner_hash,
-            u.created_dt,
-            u.transact_data,
-            rt.id AS reward_id,
-            rt.reason AS reward_reason,
-            gt.id AS game_id,
-            gt.server_secret,
-            gt.client_secret,
-            gt.game_instance,
-            gt.user_win,
-            tc.tx
-        FROM uni_transact u
-        LEFT JOIN coin c ON c.id = u.coin_id
-        LEFT JOIN reward_transact rt ON rt.ref_id = u.id
-        LEFT JOIN game_transact gt ON gt.ref_id = u.id
-        LEFT JOIN transact_chain tc ON tc.transact_id = u.id
-        WHERE (u.src = ? OR u.dst = ?)
-        ORDER BY u.id DESC
-        LIMIT ? OFFSET ?
-        """,
-        (acc_id, acc_id, limit, offset),
-    )
-    rows = await cur.fetchall()
-    results: list[Transaction] = []
-    for (
+def _keyset_page(
+    account_ids: list[int],
+    limit: int,
+    offset: int,
+    before_id: int | None,
+    after_id: int | None,
+) -> tuple[str, list[int], bool]:
+    """
+    Build the ``WHERE`` clause selecting one page of transactions touching any of
+    ``account_ids``, returning ``(clause, params, ascending)``.
+
+    Rows are always returned newest first. ``before_id`` pages towards older rows
+    (``u.id < before_id``) and ``after_id`` towards newer ones (``u.id > after_id``),
+    in which case the page is fetched in ascending order and must be reversed by
+    the caller. Each account/direction pair is read in its own subquery bounded by
+    ``limit + offset`` off the ``src``/``dst`` index, so a page costs the same no
+    matter how deep it is.
+    """
+    ascending = after_id is not None and before_id is None
+    bounds: list[str] = []
+    bound_params: list[int] = []
+    if before_id is not None:
+        bounds.append("id < ?")
+        bound_params.append(before_id)
+    if after_id is not None:
+        bounds.append("id > ?")
+        bound_params.append(after_id)
+    order = "ASC" if ascending else "DESC"
+
+    legs: list[str] = []
+    params: list[int] = []
+    for acc_id in account_ids:
+        for column in ("src", "dst"):
+            where = " AND ".join([f"{column} = ?", *bounds])
+            legs.append(
+                f"SELECT id FROM (SELECT id FROM uni_transact WHERE {where} "
+                f"ORDER BY id {order} LIMIT ?)"
+            )
+            params.extend([acc_id, *bound_params, limit + offset])
+    return f"u.id IN ({' UNION ALL '.join(legs)})", params, ascending
+
+
+TRANSACTION_COLUMNS = """
+    u.id, u.src, u.dst, u.coin_id, c.unique_name, c.read_name, u.amount, u.kind,
+    u.reason, u.inner_hash, u.created_dt, u.transact_data, rt.id AS reward_id,
+    rt.reason AS reward_reason, gt.id AS game_id, gt.server_secret,
+    gt.client_secret, gt.game_instance, gt.user_win, tc.tx
+"""
+
+_FROM_UNI = """
+FROM uni_transact u
+LEFT JOIN coin c ON c.id = u.coin_id
+LEFT JOIN reward_transact rt ON rt.ref_id = u.id
+LEFT JOIN game_transact gt ON gt.ref_id = u.id
+LEFT JOIN transact_chain tc ON tc.transact_id = u.id
+"""
+
+_FROM_CHAIN = """
+FROM transact_chain tc
+INNER JOIN uni_transact u ON u.id = tc.transact_id
+LEFT JOIN coin c ON c.id = u.coin_id
+LEFT JOIN reward_transact rt ON rt.ref_id = u.id
+LEFT JOIN game_transact gt ON gt.ref_id = u.id
+"""
+
+
+def select_transactions(where: str, tail: str = "", *, by_chain: bool = False) -> str:
+    """
+    Build a ``SELECT`` of :data:`TRANSACTION_COLUMNS` whose rows can be passed to
+    :func:`decode_transaction`. ``by_chain`` drives the join from ``transact_chain``
+    for lookups filtering on ``tc.tx``.
+    """
+    source = _FROM_CHAIN if by_chain else _FROM_UNI
+    return f"SELECT {TRANSACTION_COLUMNS} {source} WHERE {where} {tail}"
+
+
+def decode_transaction(row: Sequence[Any]) -> Transaction:
+    (
+        uid, src, dst, coin_id, coin_unique, coin_read, amount, kind, reason,
+        inner_hash, create_dt, transact_data, reward_id, reward_reason, game_id,
+        server_secret, client_secret, game_instance, user_win, tx,
+    ) = row
+    return Transaction(
         uid,
+        tx,
         src,
         dst,
         coin_id,
@@ -288,51 +382,39 @@ async def list_account_transactions(
         inner_hash,
         create_dt,
         transact_data,
-        reward_id,
-        reward_reason,
-        game_id,
-        server_secret,
-        client_secret,
-        game_instance,
-        user_win,
-        tx,
-    ) in rows:
-        reward_dc = (
-            Reward(id=reward_id, reason=reward_reason)
-            if reward_id is not None
-            else None
-        )
-        game_dc = (
-            Game(
-                id=game_id,
-                server_secret=server_secret,
-                client_secret=client_secret,
-                user_win=bool(user_win),
-                game_instance=game_instance,
-            )
+        Reward(reward_id, reward_reason) if reward_id is not None else None,
+        (
+            Game(game_id, server_secret, client_secret, game_instance, bool(user_win))
             if game_id is not None
             else None
-        )
-        results.append(
-            Transaction(
-                id=uid,
-                tx=tx,
-                src=src,
-                dst=dst,
-                coin_id=coin_id,
-                coin_unique_name=coin_unique,
-                coin_read_name=coin_read,
-                amount=amount,
-                kind=kind,
-                reason=reason,
-                inner_hash=inner_hash,
-                create_dt=create_dt,
-                transact_data=transact_data,
-                reward=reward_dc,
-                game=game_dc,
-            )
-        )
-    return results
+        ),
+    )
+
+
+async def list_account_transactions(
+    conn: ProxiedConnection,
+    account: int | Account,
+    limit: int = 100,
+    offset: int = 0,
+    *,
+    before_id: int | None = None,
+    after_id: int | None = None,
+) -> list[Transaction]:
+    acc_id = _acc_id(account)
+    page_filter, page_params, ascending = _keyset_page(
+        [acc_id], limit, offset, before_id, after_id
+    )
+    cur = await conn.execute(
+        select_transactions(
+            page_filter,
+            f"ORDER BY u.id {'ASC' if ascending else 'DESC'} LIMIT ? OFFSET ?",
+        ),
+        (*page_params, limit, offset),
+    )
+    rows = await cur.fetchall()
+    if ascending:
+        rows.reverse()
+    return [decode_transaction(row) for row in rows]
 
 
 async def list_holder_transactions(
@@ -340,6 +422,9 @@ async def list_holder_transactions(
     holder_id: int,
     limit: int = 10,
     offset: int = 0,
+    *,
+    before_id: int | None = None,
+    after_id: int | None = None,
 ) -> list[Transaction]:
     accounts_cur = await conn.execute(
         "SELECT id FROM account WHERE holder_id = ?", (holder_id,)
@@ -348,348 +433,105 @@ async def list_holder_transactions(
     if not account_ids:
         return []
 
-    placeholders = ",".join("?" for _ in account_ids)
-    query = f"""
-        SELECT
-            u.id, u.src, u.dst, u.coin_id, c.unique_name, c.read_name, u.amount, u.kind,
-            u.reason, u.inner_hash, u.created_dt, u.transact_data, rt.id AS reward_id,
-            rt.reason AS reward_reason, gt.id AS game_id, gt.server_secret,
-            gt.client_secret, gt.game_instance, gt.user_win, tc.tx
-        FROM uni_transact u
-        LEFT JOIN coin c ON c.id = u.coin_id
-        LEFT JOIN reward_transact rt ON rt.ref_id = u.id
-        LEFT JOIN game_transact gt ON gt.ref_id = u.id
-        LEFT JOIN transact_chain tc ON tc.transact_id = u.id
-        WHERE (u.src IN ({placeholders}) OR u.dst IN ({placeholders}))
-        ORDER BY u.id DESC
-        LIMIT ? OFFSET ?
-    """
-    params = account_ids + account_ids + [limit, offset]
-    cur = await conn.execute(query, tuple(params))
+    page_filter, page_params, ascending = _keyset_page(
+        account_ids, limit, offset, before_id, after_id
+    )
+    cur = await conn.execute(
+        select_transactions(
+            page_filter,
+            f"ORDER BY u.id {'ASC' if ascending else 'DESC'} LIMIT ? OFFSET ?",
+        ),
+        (*page_params, limit, offset),
+    )
     rows = await cur.fetchall()
-    results: list[Transaction] = []
-    for row in rows:
-        (
-            uid, src, dst, coin_id, coin_unique, coin_read, amount, kind, reason,
-            inner_hash, create_dt, transact_data, reward_id, reward_reason, game_id,
-            server_secret, client_secret, game_instance, user_win, tx,
-        ) = row
-        reward_dc = (
-            Reward(id=reward_id, reason=reward_reason)
-            if reward_id is not None
-            else None
-        )
-        game_dc = (
-            Game(
-                id=game_id,
-                server_secret=server_secret,
-                client_secret=client_secret,
-                user_win=bool(user_win),
-                game_instance=game_instance,
-            )
-            if game_id is not None
-            else None
-        )
-        results.append(
-            Transaction(
-                id=uid,
-                tx=tx,
-                src=src,
-                dst=dst,
-                coin_id=coin_id,
-                coin_unique_name=coin_unique,
-                coin_read_name=coin_read,
-                amount=amount,
-                kind=kind,
-                reason=reason,
-                inner_hash=inner_hash,
-                create_dt=create_dt,
-                transact_data=transact_data,
-                reward=reward_dc,
-                game=game_dc,
-            )
+    if ascending:
+        rows.reverse()
+    return [decode_transaction(row) for row in rows]
+
+
+async def iter_holder_transactions(
+    conn: ProxiedConnection, holder_id: int, batch_size: int = 500
+) -> AsyncIterator[list[Transaction]]:
+    """
+    Every transaction touching the holder's accounts, oldest first, in batches of
+    at most ``batch_size``. Each batch is one keyset page after the last id seen,
+    read off the ``src``/``dst`` indexes like :func:`list_holder_transactions`, so
+    memory stays bounded by the batch however long the history is. Run it inside a
+    read transaction for the batches to come from one snapshot.
+    """
+    accounts_cur = await conn.execute(
+        "SELECT id FROM account WHERE holder_id = ?", (holder_id,)
+    )
+    account_ids = [row[0] for row in await accounts_cur.fetchall()]
+    if not account_ids:
+        return
+
+    last_id = 0
+    while True:
+        page_filter, page_params, _ = _keyset_page(account_ids, batch_size, 0, None, last_id)
+        cur = await conn.execute(
+            select_transactions(page_filter, "ORDER BY u.id ASC LIMIT ?"),
+            (*page_params, batch_size),
         )
-    return results
+        batch = [decode_transaction(row) for row in await cur.fetchmany(batch_size)]
+        if batch:
+            yield batch
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1].id
 
 
 async def get_transaction_by_uni_id(
     conn: ProxiedConnection, uni_id: int
 ) -> Transaction | None:
-    cur = await conn.execute(
-        """
-        SELECT
-            u.id,
-            u.src,
-            u.dst,
-            u.coin_id,
-            c.unique_name,
-            c.read_name,
-            u.amount,
-            u.kind,
-            u.reason,
-            u.inner_hash,
-            u.created_dt,
-            u.transact_data,
-            rt.id AS reward_id,
-            rt.reason AS reward_reason,
-            gt.id AS game_id,
-            gt.server_secret,
-            gt.client_secret,
-            gt.game_instance,
-            gt.user_win,
-            tc.tx
-        FROM uni_transact u
-        LEFT JOIN coin c ON c.id = u.coin_id
-        LEFT JOIN reward_transact rt ON rt.ref_id = u.id
-        LEFT JOIN game_transact gt ON gt.ref_id = u.id
-        LEFT JOIN transact_chain tc ON tc.transact_id = u.id
-        WHERE u.id = ?
-        """,
-        (uni_id,),
-    )
+    cur = await conn.execute(select_transactions("u.id = ?"), (uni_id,))
     row = await cur.fetchone()
-    if not row:
-        return None
-    (
-        uid,
-        src,
-        dst,
-        coin_id,
-        coin_unique,
-        coin_read,
-        amount,
-        kind,
-        reason,
-        inner_hash,
-        create_dt,
-        transact_data,
-        reward_id,
-        reward_reason,
-        game_id,
-        server_secret,
-        client_secret,
-        game_instance,
-        user_win,
-        tx,
-    ) = row
-    reward_dc = (
-        Reward(id=reward_id, reason=reward_reason) if reward_id is not None else None
-    )
-    game_dc = (
-        Game(
-            id=game_id,
-            server_secret=server_secret,
-            client_secret=client_secret,
-            game_instance=game_instance,
-            user_win=bool(user_win),
-        )
-        if game_id is not None
-        else None
-    )
-    return Transaction(
-        id=uid,
-        tx=tx,
-        src=src,
-        dst=dst,
-        coin_id=coin_id,
-        coin_unique_name=coin_unique,
-        coin_read_name=coin_read,
-        amount=amount,
-        kind=kind,
-        reason=reason,
-        inner_hash=inner_hash,
-        create_dt=create_dt,
-        transact_data=transact_data,
-        reward=reward_dc,
-        game=game_dc,
-    )
+    return decode_transaction(row) if row else None
 
 
-async def get_transaction_by_tx(conn: ProxiedConnection, tx: str) -> Transaction | None:
+async def get_transactions_by_uni_ids(
+    conn: ProxiedConnection, uni_ids: list[int]
+) -> dict[int, Transaction]:
+    if not uni_ids:
+        return {}
+    placeholders = ",".join("?" for _ in uni_ids)
     cur = await conn.execute(
-        """
-        SELECT
-            u.id,
-            u.src,
-            u.dst,
-            u.coin_id,
-            c.unique_name,
-            c.read_name,
-            u.amount,
-            u.kind,
-            u.reason,
-            u.inner_hash,
-            u.created_dt,
-            u.transact_data,
-            rt.id AS reward_id,
-            rt.reason AS reward_reason,
-            gt.id AS game_id,
-            gt.server_secret,
-            gt.client_secret,
-            gt.game_instance,
-            gt.user_win,
-            tc.tx
-        FROM transact_chain tc
-        INNER JOIN uni_transact u ON u.id = tc.transact_id
-        LEFT JOIN coin c ON c.id = u.coin_id
-        LEFT JOIN reward_transact rt ON rt.ref_id = u.id
-        LEFT JOIN game_transact gt ON gt.ref_id = u.id
-        WHERE tc.tx = ?
-        """,
-        (tx,),
+        select_transactions(f"u.id IN ({placeholders})"), tuple(uni_ids)
     )
+    return {
+        transaction.id: transaction
+        for transaction in map(decode_transaction, await cur.fetchall())
+    }
+
+
+async def get_transaction_by_tx(conn: ProxiedConnection, tx: str) -> Transaction | None:
+    cur = await conn.execute(select_transactions("tc.tx = ?", by_chain=True), (tx,))
     row = await cur.fetchone()
-    if not row:
-        return None
-    (
-        uid,
-        src,
-        dst,
-        coin_id,
-        coin_unique,
-        coin_read,
-        amount,
-        kind,
-        reason,
-        inner_hash,
-        create_dt,
-        transact_data,
-        reward_id,
-        reward_reason,
-        game_id,
-        server_secret,
-        client_secret,
-        game_instance,
-        user_win,
-        tx,
-    ) = row
-    reward_dc = (
-        Reward(id=reward_id, reason=reward_reason) if reward_id is not None else None
-    )
-    game_dc = (
-        Game(
-            id=game_id,
-            server_secret=server_secret,
-            client_secret=client_secret,
-            user_win=bool(user_win),
-            game_instance=game_instance,
-        )
-        if game_id is not None
-        else None
-    )
-    return Transaction(
-        id=uid,
-        tx=tx,
-        src=src,
-        dst=dst,
-        coin_id=coin_id,
-        coin_unique_name=coin_unique,
-        coin_read_name=coin_read,
-        amount=amount,
-        kind=kind,
-        reason=reason,
-        inner_hash=inner_hash,
-        create_dt=create_dt,
-        transact_data=transact_data,
-        reward=reward_dc,
-        game=game_dc,
-    )
+    return decode_transaction(row) if row else None
 
 
 async def get_transactions_by_partial_tx(
-    conn: ProxiedConnection, partial_tx: str
+    conn: ProxiedConnection, partial_tx: str, limit: int = 2
 ) -> list[Transaction]:
+    """
+    Up to ``limit`` transactions whose tx hash starts with ``partial_tx``. The prefix
+    is turned into a ``[prefix, next prefix)`` range so the lookup is a seek on the
+    unique index of ``tx``; the default limit is enough to tell a unique match from
+    an ambiguous one.
+    """
+    low = partial_tx.lower()
+    if not TX_PREFIX.fullmatch(low):
+        return []
+    # Next prefix of the same length or shorter, "ab0f" -> "ab1"; none past "fff..."
+    stem = low.rstrip("f")
+    where, params = "tc.tx >= ?", [low]
+    if stem:
+        where += " AND tc.tx < ?"
+        params.append(stem[:-1] + _HEX_DIGITS[_HEX_DIGITS.index(stem[-1]) + 1])
     cur = await conn.execute(
-        """
-        SELECT
-            u.id,
-            u.src,
-            u.dst,
-            u.coin_id,
-            c.unique_name,
-            c.read_name,
-            u.amount,
-            u.kind,
-            u.reason,
-            u.inner_hash,
-            u.created_dt,
-            u.transact_data,
-            rt.id AS reward_id,
-            rt.reason AS reward_reason,
-            gt.id AS game_id,
-            gt.server_secret,
-            gt.client_secret,
-            gt.game_instance,
-            gt.user_win,
-            tc.tx
-        FROM transact_chain tc
-        INNER JOIN uni_transact u ON u.id = tc.transact_id
-        LEFT JOIN coin c ON c.id = u.coin_id
-        LEFT JOIN reward_transact rt ON rt.ref_id = u.id
-        LEFT JOIN game_transact gt ON gt.ref_id = u.id
-        WHERE tc.tx LIKE ?
-        """,
-        (f"{partial_tx}%",),
+        select_transactions(where, "ORDER BY tc.tx LIMIT ?", by_chain=True), (*params, limit)
     )
-    rows = await cur.fetchall()
-    results: list[Transaction] = []
-    for row in rows:
-        (
-            uid,
-            src,
-            dst,
-            coin_id,
-            coin_unique,
-            coin_read,
-            amount,
-            kind,
-            reason,
-            inner_hash,
-            create_dt,
-            transact_data,
-            reward_id,
-            reward_reason,
-            game_id,
-            server_secret,
-            client_secret,
-            game_instance,
-            user_win,
-            tx,
-        ) = row
-        reward_dc = (
-            Reward(id=reward_id, reason=reward_reason) if reward_id is not None else None
-        )
-        game_dc = (
-            Game(
-                id=game_id,
-                server_secret=server_secret,
-                client_secret=client_secret,
-                user_win=bool(user_win),
-                game_instance=game_instance,
-            )
-            if game_id is not None
-            else None
-        )
-        results.append(
-            Transaction(
-                id=uid,
-                tx=tx,
-                src=src,
-                dst=dst,
-                coin_id=coin_id,
-                coin_unique_name=coin_unique,
-                coin_read_name=coin_read,
-                amount=amount,
-                kind=kind,
-                reason=reason,
-                inner_hash=inner_hash,
-                create_dt=create_dt,
-                transact_data=transact_data,
-                reward=reward_dc,
-                game=game_dc,
-            )
-        )
-    return results
+    return [decode_transaction(row) for row in await cur.fetchall()]
 
 
 async def get_transaction(conn: ProxiedConnection, id: str | int) -> Transaction | None:
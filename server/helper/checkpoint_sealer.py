@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+from fastapi.applications import FastAPI
+
+from database.checkpoint import seal_checkpoints
+from helper.ledger_writer import LedgerWriter
+
+logger = logging.getLogger(__name__)
+
+SEAL_INTERVAL = 30.0
+# Blocks sealed per ledger operation, so a large backlog does not hold the writer
+# and the payments queued behind it for the whole catch-up
+BLOCKS_PER_OP = 1
+
+
+class CheckpointSealer:
+    """Periodically seals complete chain blocks into ``chain_checkpoint`` through the ledger writer."""
+
+    def __init__(self, ledger: LedgerWriter, interval: float = SEAL_INTERVAL):
+        self._ledger = ledger
+        self._interval = interval
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="checkpoint-sealer")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            _ = self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while sealed := await self._ledger.submit(
+                    lambda conn: seal_checkpoints(conn, max_blocks=BLOCKS_PER_OP)
+                ):
+                    for checkpoint in sealed:
+                        logger.info(
+                            "Sealed chain block %s (order_op %s-%s)",
+                            checkpoint.block_no,
+                            checkpoint.first_order_op,
+                            checkpoint.last_order_op,
+                        )
+            except Exception:
+                logger.error("Failed to seal chain checkpoints", exc_info=True)
+            await asyncio.sleep(self._interval)
+
+
+async def start_checkpoint_sealer(app: FastAPI) -> None:
+    sealer = CheckpointSealer(app.state.ledger)  # pyright: ignore[reportAny]
+    await sealer.start()
+    app.state.checkpoint_sealer = sealer
+
+
+async def stop_checkpoint_sealer(app: FastAPI) -> None:
+    sealer: CheckpointSealer | None = getattr(app.state, "checkpoint_sealer", None)
+    if sealer:
+        await sealer.close()
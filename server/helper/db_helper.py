@@ -1,46 +1,170 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
+import anyio
 import asqlite
 from fastapi import Request
 from fastapi.applications import FastAPI
 
+from database.transact import chain_tip
+
 DB_PATH = Path() / "data" / "gamba.db"
 SCHEMA_PATH = Path() / "sql" / "schema.sql"
+MIGRATIONS_PATH = Path() / "sql" / "migrations"
 
 PRAGMAS = [
-    "PRAGMA journal_mode=WAL;",
     "PRAGMA synchronous=NORMAL;",
     "PRAGMA foreign_keys=ON;",
     "PRAGMA temp_store=MEMORY;",
-    "PRAGMA cache_size=-2000;",  # ~2MB
 ]
+# Reported on /health as read back from a live connection, since SQLite may clamp them
+TUNED_PRAGMAS = ["cache_size", "mmap_size", "busy_timeout", "wal_autocheckpoint", "synchronous"]
 
 type DB = asqlite.ProxiedConnection
 
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+@dataclass(frozen=True)
+class DBSettings:
+    """Pool sizes and per-connection tuning, overridable with ``DB_*`` env variables."""
+
+    pool_size: int = 8
+    # At least 4 whatever the core count, so a long export cannot hold every read connection
+    read_pool_size: int = max(4, os.cpu_count() or 4)
+    # Read connections history exports may hold at once, the rest stay free for short reads
+    export_slots: int = 2
+    cache_size: int = -65536  # negative is KiB, so 64MB per connection
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout: int = 5000  # ms
+    wal_autocheckpoint: int = 1000  # pages
+
+    @classmethod
+    def from_env(cls) -> "DBSettings":
+        default = cls()
+        return cls(
+            pool_size=_env_int("DB_POOL_SIZE", default.pool_size),
+            read_pool_size=_env_int("DB_READ_POOL_SIZE", default.read_pool_size),
+            export_slots=_env_int("DB_EXPORT_SLOTS", default.export_slots),
+            cache_size=_env_int("DB_CACHE_SIZE", default.cache_size),
+            mmap_size=_env_int("DB_MMAP_SIZE", default.mmap_size),
+            busy_timeout=_env_int("DB_BUSY_TIMEOUT", default.busy_timeout),
+            wal_autocheckpoint=_env_int("DB_WAL_AUTOCHECKPOINT", default.wal_autocheckpoint),
+        )
+
+    def pragmas(self) -> list[str]:
+        return [
+            *PRAGMAS,
+            f"PRAGMA cache_size={self.cache_size};",
+            f"PRAGMA mmap_size={self.mmap_size};",
+            f"PRAGMA busy_timeout={self.busy_timeout};",
+            f"PRAGMA wal_autocheckpoint={self.wal_autocheckpoint};",
+        ]
+
+
+def _init_connection(pragmas: list[str], conn: sqlite3.Connection) -> None:
+    # asqlite runs this on every connection the pool opens, before handing it out
+    for pragma in pragmas:
+        _ = conn.execute(pragma)
 
-async def init_pool(app: FastAPI, size: int = 8):
-    if not DB_PATH.exists():
+
+def list_migrations() -> list[tuple[int, Path]]:
+    """
+    Migrations are ``sql/migrations/NNNN_description.sql`` files applied in order
+    of their number on top of ``schema.sql``. The applied version is tracked in
+    ``PRAGMA user_version``.
+    """
+    migrations: list[tuple[int, Path]] = []
+    for path in MIGRATIONS_PATH.glob("*.sql"):
+        version, _, _ = path.stem.partition("_")
+        migrations.append((int(version), path))
+    return sorted(migrations)
+
+
+async def migrate(conn: asqlite.Connection | DB) -> int:
+    row = await (await conn.execute("PRAGMA user_version;")).fetchone()
+    current: int = row[0]
+    for version, path in list_migrations():
+        if version <= current:
+            continue
+        logger.info("Applying migration %s", path.name)
+        try:
+            _ = await conn.executescript(
+                f"BEGIN IMMEDIATE;\n{path.read_text()}\nPRAGMA user_version = {version};\nCOMMIT;"
+            )
+        except Exception:
+            try:
+                _ = await conn.execute("ROLLBACK;")
+            except sqlite3.OperationalError:
+                pass  # Failed before the transaction was opened
+            raise
+        current = version
+    return current
+
+
+async def init_pool(app: FastAPI, settings: DBSettings | None = None):
+    settings = settings or DBSettings.from_env()
+    fresh = not DB_PATH.exists()
+    if fresh:
         DB_PATH.parent.mkdir(parents=True, exist_ok=True)
         DB_PATH.touch()
-        async with asqlite.connect(DB_PATH.absolute().as_posix()) as conn:
+    async with asqlite.connect(DB_PATH.absolute().as_posix()) as conn:
+        if fresh:
             _ = await conn.executescript(SCHEMA_PATH.read_text())
             await conn.commit()
+        _ = await migrate(conn)
+    app.state.db_settings = settings
     app.state.db_pool = await asqlite.create_pool(
-        DB_PATH.absolute().as_posix(), size=size
+        DB_PATH.absolute().as_posix(),
+        size=settings.pool_size,
+        init=partial(_init_connection, settings.pragmas()),
     )
-    # Initialize all currently created connections with PRAGMAs.
-    # Pool lazily creates up to max_size; only those pre-created get PRAGMAs now.
-    for _ in range(size):
-        async with app.state.db_pool.acquire() as conn:
-            for pragma in PRAGMAS:
-                _ = await conn.execute(pragma)
-            await conn.commit()
+    async with app.state.db_pool.acquire() as conn:
+        _ = await chain_tip.load(conn)
+
+    # Reads get their own pool so they never wait on the write lock. The file is
+    # already in WAL mode, so readers see the last committed snapshot.
+    app.state.db_read_pool = await asqlite.create_pool(
+        f"file:{DB_PATH.absolute().as_posix()}?mode=ro",
+        size=settings.read_pool_size,
+        init=partial(_init_connection, [*settings.pragmas(), "PRAGMA query_only=ON;"]),
+        uri=True,
+    )
+    app.state.db_export_slots = asyncio.Semaphore(settings.export_slots)
+
+
+async def get_pool_info(app: FastAPI) -> dict[str, int]:
+    settings: DBSettings = app.state.db_settings  # pyright: ignore[reportAny]
+    info = {
+        "pool_size": settings.pool_size,
+        "read_pool_size": settings.read_pool_size,
+        "export_slots": settings.export_slots,
+    }
+    pool: asqlite.Pool = app.state.db_read_pool  # pyright: ignore[reportAny]
+    async with pool.acquire() as conn:
+        for name in TUNED_PRAGMAS:
+            row = await (await conn.execute(f"PRAGMA {name};")).fetchone()
+            info[name] = int(row[0])
+    return info
 
 
 async def close_pool(app: FastAPI):
-    pool: asqlite.Pool | None = getattr(app.state, "db_pool", None)
-    if pool:
-        await pool.close()
+    for name in ("db_read_pool", "db_pool"):
+        pool: asqlite.Pool | None = getattr(app.state, name, None)
+        if pool:
+            await pool.close()
 
 
 async def get_conn(request: Request):
@@ -49,6 +173,41 @@ async def get_conn(request: Request):
         yield conn
 
 
+@asynccontextmanager
+async def read_snapshot(pool: asqlite.Pool) -> AsyncIterator[DB]:
+    """
+    Connection from the read-only pool. Statements run in one deferred
+    transaction, so they all see the same snapshot without taking the write lock.
+
+    The transaction is ended even when the caller is cancelled, e.g. a client
+    dropping a streamed response. A connection returned to the pool inside it
+    would fail every later ``BEGIN`` and pin its WAL snapshot, so checkpoints stall.
+    """
+    async with pool.acquire() as conn:
+        if conn.get_connection().in_transaction:
+            # Left open by a cancellation the shield below did not cover
+            _ = await conn.execute("ROLLBACK;")
+        _ = await conn.execute("BEGIN;")
+        try:
+            yield conn
+        finally:
+            with anyio.CancelScope(shield=True):
+                _ = await conn.execute("ROLLBACK;")
+
+
+async def get_read_pool(request: Request) -> asqlite.Pool:
+    return request.state.parent.state.db_read_pool  # pyright: ignore[reportAny]
+
+
+async def get_export_slots(request: Request) -> asyncio.Semaphore:
+    return request.state.parent.state.db_export_slots  # pyright: ignore[reportAny]
+
+
+async def get_read_conn(request: Request):
+    async with read_snapshot(await get_read_pool(request)) as conn:
+        yield conn
+
+
 async def get_tx_conn(request: Request, immediate: bool = True):
     pool: asqlite.Pool = request.state.parent.state.db_pool  # pyright: ignore[reportAny]
     async with pool.acquire() as conn:
@@ -59,7 +218,12 @@ async def get_tx_conn(request: Request, immediate: bool = True):
         try:
             yield conn
         except Exception:
+            chain_tip.invalidate()
             _ = await conn.execute("ROLLBACK;")
             raise
         else:
-            _ = await conn.execute("COMMIT;")
+            try:
+                _ = await conn.execute("COMMIT;")
+            except Exception:
+                chain_tip.invalidate()
+                raise
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import secrets
+import time
+from collections import deque
+
+from fastapi import Request
+from fastapi.applications import FastAPI
+
+from database.game import (
+    create_game_instances,
+    delete_expired_game_instances,
+    delete_unused_game_instances,
+)
+from helper.db_helper import DB
+from helper.ledger_writer import LedgerWriter
+from schema.db import GameInstance
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 256
+REFILL_BELOW = 64
+REFILL_BATCH = 128
+# A game handed out and not played within this long is swept away
+UNPLAYED_TTL = 24 * 60 * 60
+# Stock older than this is dropped instead of handed out, so every game handed out
+# has at least ``UNPLAYED_TTL - STOCK_MAX_AGE`` left to be played
+STOCK_MAX_AGE = UNPLAYED_TTL / 2
+SWEEP_INTERVAL = 60 * 60
+
+
+def _new_secrets(count: int) -> list[tuple[str, str]]:
+    return [(secrets.token_hex(64), secrets.token_hex(64)) for _ in range(count)]
+
+
+class GameInstancePool:
+    """
+    Keeps a stock of committed, never handed out ``game_instance`` rows.
+
+    A background task tops the stock up in bulk through the ledger writer whenever
+    it drops below ``refill_below``. Claiming an instance just pops it from memory,
+    so ``/game/init`` does not touch the database at all unless the stock has run
+    dry. Only this process knows which rows are stock, so the stock is deleted
+    again on ``close``. Rows a crash left behind, and games handed out but never
+    played, are swept once they are ``UNPLAYED_TTL`` old.
+    """
+
+    def __init__(
+        self,
+        ledger: LedgerWriter,
+        size: int = POOL_SIZE,
+        refill_below: int = REFILL_BELOW,
+        sweep_interval: float = SWEEP_INTERVAL,
+    ):
+        self._ledger = ledger
+        self._size = size
+        self._refill_below = refill_below
+        self._sweep_interval = sweep_interval
+        # (monotonic time it was created, instance)
+        self._ready: deque[tuple[float, GameInstance]] = deque()
+        self._wanted = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    async def start(self) -> None:
+        self._wanted.set()
+        self._tasks = [
+            asyncio.create_task(self._run(), name="game-instance-pool"),
+            asyncio.create_task(self._sweep(), name="game-instance-sweeper"),
+        ]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            _ = task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        stock = [instance.game_id for _, instance in self._ready]
+        self._ready.clear()
+        if stock:
+            try:
+                _ = await self._ledger.submit(lambda conn: delete_unused_game_instances(conn, stock))
+            except Exception:
+                logger.error("Failed to release game instance stock", exc_info=True)
+
+    async def claim(self, writer: DB | None = None) -> GameInstance:
+        """
+        Hand out an instance. Pass ``writer`` when called from inside a ledger
+        operation, an instance that has to be created inline then goes through it.
+        """
+        stale_before = time.monotonic() - STOCK_MAX_AGE
+        while self._ready and self._ready[0][0] < stale_before:
+            # Left for the sweeper, it is past its age by the time that runs
+            _ = self._ready.popleft()
+        if len(self._ready) < self._refill_below:
+            self._wanted.set()
+        if self._ready:
+            return self._ready.popleft()[1]
+        # Stock ran dry, create one inline rather than wait for the refill
+        pairs = _new_secrets(1)
+        if writer is not None:
+            return (await create_game_instances(writer, pairs))[0]
+        return (await self._ledger.submit(lambda conn: create_game_instances(conn, pairs)))[0]
+
+    async def _run(self) -> None:
+        while True:
+            await self._wanted.wait()
+            self._wanted.clear()
+            try:
+                while len(self._ready) < self._size:
+                    pairs = _new_secrets(min(REFILL_BATCH, self._size - len(self._ready)))
+                    created = await self._ledger.submit(
+                        lambda conn: create_game_instances(conn, pairs)
+                    )
+                    now = time.monotonic()
+                    self._ready.extend((now, instance) for instance in created)
+            except Exception:
+                logger.error("Failed to refill game instance pool", exc_info=True)
+                await asyncio.sleep(1)
+                self._wanted.set()
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                swept = await self._ledger.submit(
+                    lambda conn: delete_expired_game_instances(conn, UNPLAYED_TTL)
+                )
+                if swept:
+                    logger.info("Swept %s unplayed game instances", swept)
+            except Exception:
+                logger.error("Failed to sweep game instances", exc_info=True)
+            await asyncio.sleep(self._sweep_interval)
+
+
+async def start_game_pool(app: FastAPI) -> None:
+    pool = GameInstancePool(app.state.ledger)  # pyright: ignore[reportAny]
+    await pool.start()
+    app.state.game_pool = pool
+
+
+async def stop_game_pool(app: FastAPI) -> None:
+    pool: GameInstancePool | None = getattr(app.state, "game_pool", None)
+    if pool:
+        await pool.close()
+
+
+async def get_game_pool(request: Request) -> GameInstancePool:
+    return request.state.parent.state.game_pool  # pyright: ignore[reportAny]
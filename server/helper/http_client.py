@@ -0,0 +1,24 @@
+import aiohttp
+from fastapi import Request
+from fastapi.applications import FastAPI
+
+DISCORD_API_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+
+
+async def start_http_client(app: FastAPI) -> None:
+    """
+    One pooled session for outbound Discord API calls, so login callbacks reuse
+    warm TLS connections and cached DNS instead of opening new ones each time.
+    """
+    connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+    app.state.http_client = aiohttp.ClientSession(connector=connector, timeout=DISCORD_API_TIMEOUT)
+
+
+async def stop_http_client(app: FastAPI) -> None:
+    session: aiohttp.ClientSession | None = getattr(app.state, "http_client", None)
+    if session:
+        await session.close()
+
+
+async def get_http_client(request: Request) -> aiohttp.ClientSession:
+    return request.state.parent.state.http_client  # pyright: ignore[reportAny]
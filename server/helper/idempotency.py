@@ -0,0 +1,68 @@
+import time
+from typing import Annotated
+
+from fastapi import Depends, Header, HTTPException, Request, Response
+
+from database.idempotency import (
+    IdempotencyKeyReusedError,
+    get_idempotent_response,
+    store_idempotent_response,
+)
+from crypto.hashing import sha3_512_hex
+from helper.db_helper import DB
+from helper.json_response import dump_json
+from helper.jwt_helper import get_user
+
+IDEMPOTENCY_TTL = 24 * 60 * 60
+
+
+class Idempotency:
+    """
+    ``Idempotency-Key`` of a write request, scoped to the caller and bound to the
+    request path and body. A handler replays the stored response before doing any
+    work, and stores its response from inside the ledger operation that did the
+    work, so a retry never reaches the ledger twice. Without the header both are
+    no-ops.
+    """
+
+    def __init__(self, user_id: int, key: str | None, request_hash: str):
+        self.user_id = user_id
+        self.key = key
+        self.request_hash = request_hash
+
+    async def replay(self, conn: DB) -> Response | None:
+        if self.key is None:
+            return None
+        try:
+            stored = await get_idempotent_response(
+                conn, self.user_id, self.key, self.request_hash, int(time.time())
+            )
+        except IdempotencyKeyReusedError:
+            raise HTTPException(422, "The Idempotency-Key was already used for a different request")
+        if stored is None:
+            return None
+        return Response(stored, media_type="application/json", headers={"Idempotent-Replayed": "true"})
+
+    async def store[T](self, conn: DB, response: T) -> T:
+        if self.key is not None:
+            await store_idempotent_response(
+                conn,
+                self.user_id,
+                self.key,
+                self.request_hash,
+                dump_json(response).decode(),
+                int(time.time()),
+                IDEMPOTENCY_TTL,
+            )
+        return response
+
+
+async def get_idempotency(
+    request: Request,
+    user_id: Annotated[int, Depends(get_user)],
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
+) -> Idempotency:
+    body = await request.body()
+    return Idempotency(
+        user_id, idempotency_key, sha3_512_hex(request.url.path.encode() + b"::" + body)
+    )
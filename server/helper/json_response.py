@@ -0,0 +1,43 @@
+import functools
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+
+
+@functools.cache
+def serializer(tp: Any) -> TypeAdapter[Any]:
+    """Serializer for ``tp``, compiled by pydantic-core on first use and kept for the process."""
+    return TypeAdapter(tp)
+
+
+def dump_json(value: object, tp: Any = None) -> bytes:
+    """``value`` as compact JSON, serialised as ``tp`` (its own type by default)."""
+    return serializer(type(value) if tp is None else tp).dump_json(value)
+
+
+class JSONRoute(APIRoute):
+    """
+    Route that serialises what its endpoint returns straight to JSON bytes with the
+    precompiled serializer of its response model. The endpoints build the schema
+    dataclasses themselves, so FastAPI's default of validating them against the
+    model again, dumping them to Python objects, walking those with
+    ``jsonable_encoder`` and only then calling ``json.dumps`` is skipped. A
+    ``Response`` returned by the endpoint is sent as is.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        @functools.wraps(endpoint)
+        async def render(**values: Any) -> Any:
+            result = await endpoint(**values)
+            if isinstance(result, Response) or self.response_model is None:
+                return result
+            return Response(
+                dump_json(result, self.response_model),
+                status_code=self.status_code or 200,
+                media_type="application/json",
+            )
+
+        super().__init__(path, render, **kwargs)
@@ -1,3 +1,8 @@
+from collections import OrderedDict
+import hashlib
+import math
+import time
+
 from crypto.jwt_handler import JWTHandler
 import os
 import logging
@@ -14,6 +19,44 @@ class AuthError(HTTPException):
         super().__init__(status_code=status_code, detail=detail)
 
 
+class VerifiedTokenCache:
+    """
+    ``user_id`` and expiry of tokens that passed verification, keyed by a digest of
+    the token. A cached token skips signature and claim checks until it expires.
+    Holds at most ``maxsize`` tokens, evicting the least recently used.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self._maxsize = maxsize
+        self._tokens: OrderedDict[bytes, tuple[int, float]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> int | None:
+        key = self._key(token)
+        cached = self._tokens.get(key)
+        if cached is None:
+            return None
+        user_id, exp = cached
+        if exp <= time.time():
+            del self._tokens[key]
+            return None
+        self._tokens.move_to_end(key)
+        return user_id
+
+    def put(self, token: str, user_id: int, exp: float) -> None:
+        key = self._key(token)
+        self._tokens[key] = (user_id, exp)
+        self._tokens.move_to_end(key)
+        if len(self._tokens) > self._maxsize:
+            _ = self._tokens.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache()
+
+
 async def get_user(
     request: Request,
 ) -> int:
@@ -24,13 +67,19 @@ async def get_user(
             raise AuthError("Not logged in")
     else:
         jwt_value = request.cookies["login"]
+    user_id = verified_tokens.get(jwt_value)
+    if user_id is not None:
+        return user_id
     try:
         jwt_inner = jwt_handler.decode(jwt_value)
     except Exception:
         logger.error("Failed to decode JWT", exc_info=True)
         raise AuthError("Invalid token")
-    if jwt_inner.get("user_id") is None or not isinstance(jwt_inner["user_id"], int):
-        print(jwt_inner)
+    user_id = jwt_inner.get("user_id")
+    if user_id is None or not isinstance(user_id, int):
+        logger.debug("Token without a valid user_id", extra={"claims": dict(jwt_inner)})
         raise AuthError("Invalid token")
-    print(jwt_inner)
-    return jwt_inner["user_id"]
+    exp = jwt_inner.get("exp")
+    verified_tokens.put(jwt_value, user_id, float(exp) if isinstance(exp, (int, float)) else math.inf)
+    logger.debug("Verified token", extra={"user_id": user_id, "exp": exp})
+    return user_id
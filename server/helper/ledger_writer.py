@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import sqlite3
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import asqlite
+from fastapi import Request
+from fastapi.applications import FastAPI
+
+from database.transact import chain_tip
+from helper.db_helper import DB
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 64
+
+type LedgerOp[T] = Callable[[DB], Awaitable[T]]
+
+
+@dataclass
+class _Intent:
+    op: LedgerOp[object]
+    future: asyncio.Future[object]
+
+
+class LedgerWriter:
+    """
+    Single writer for every ledger mutation.
+
+    Callers submit an operation and await its result. A dedicated task drains the
+    queue and applies whatever is pending as one batch inside a single
+    ``BEGIN IMMEDIATE`` transaction, so the chain is extended sequentially and the
+    cost of a commit is shared by the whole batch. Each operation runs in its own
+    savepoint: a failing operation is rolled back and its exception is handed to
+    its caller without affecting the rest of the batch. Futures are only resolved
+    once the batch has been committed.
+    """
+
+    def __init__(self, pool: asqlite.Pool, max_batch: int = MAX_BATCH):
+        self._pool = pool
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue[_Intent] = asyncio.Queue()
+        self._conn: asqlite.ProxiedConnection | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        self._conn = await self._pool.acquire()
+        self._task = asyncio.create_task(self._run(), name="ledger-writer")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            await self._queue.join()
+            _ = self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            await self._pool.release(self._conn)
+            self._conn = None
+
+    async def submit[T](self, op: LedgerOp[T]) -> T:
+        future: asyncio.Future[object] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Intent(op, future))
+        return await future  # pyright: ignore[reportReturnType]
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._apply(batch)
+            except Exception:
+                logger.error("Ledger batch failed", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _apply(self, batch: list[_Intent]) -> None:
+        conn = self._conn
+        assert conn is not None, "LedgerWriter used before start()"
+        outcomes: list[tuple[_Intent, object, BaseException | None]] = []
+        try:
+            _ = await conn.execute("BEGIN IMMEDIATE;")
+            for intent in batch:
+                if intent.future.done():
+                    # Caller went away before we got to it, nothing to apply.
+                    continue
+                _ = await conn.execute("SAVEPOINT ledger_intent;")
+                try:
+                    result = await intent.op(conn)
+                except Exception as e:
+                    chain_tip.invalidate()
+                    _ = await conn.execute("ROLLBACK TO ledger_intent;")
+                    _ = await conn.execute("RELEASE ledger_intent;")
+                    outcomes.append((intent, None, e))
+                else:
+                    _ = await conn.execute("RELEASE ledger_intent;")
+                    outcomes.append((intent, result, None))
+            _ = await conn.execute("COMMIT;")
+        except Exception as e:
+            chain_tip.invalidate()
+            try:
+                _ = await conn.execute("ROLLBACK;")
+            except sqlite3.OperationalError:
+                pass  # No transaction was active
+            for intent in batch:
+                if not intent.future.done():
+                    intent.future.set_exception(e)
+            raise
+        for intent, result, exc in outcomes:
+            if intent.future.done():
+                continue
+            if exc is not None:
+                intent.future.set_exception(exc)
+            else:
+                intent.future.set_result(result)
+
+
+async def start_ledger_writer(app: FastAPI) -> None:
+    writer = LedgerWriter(app.state.db_pool)  # pyright: ignore[reportAny]
+    await writer.start()
+    app.state.ledger = writer
+
+
+async def stop_ledger_writer(app: FastAPI) -> None:
+    writer: LedgerWriter | None = getattr(app.state, "ledger", None)
+    if writer:
+        await writer.close()
+
+
+async def get_ledger(request: Request) -> LedgerWriter:
+    return request.state.parent.state.ledger  # pyright: ignore[reportAny]
@@ -0,0 +1,55 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Response
+
+from helper.json_response import dump_json
+from schema.db import Transaction
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+    def response(self, if_none_match: str | None = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": IMMUTABLE}
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            if "*" in tags or self.etag in tags:
+                return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class TransactionResponseCache:
+    """
+    Serialised ``Transaction`` bodies keyed by uni id and by full tx hash. A
+    committed transaction never changes, so entries never go stale and are only
+    evicted, least recently used first, once more than ``maxsize`` keys are held.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._maxsize = maxsize
+        self._responses: OrderedDict[int | str, CachedResponse] = OrderedDict()
+
+    def get(self, key: int | str) -> CachedResponse | None:
+        cached = self._responses.get(key)
+        if cached is not None:
+            self._responses.move_to_end(key)
+        return cached
+
+    def put(self, transaction: Transaction) -> CachedResponse:
+        body = dump_json(transaction, Transaction)
+        cached = CachedResponse(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+        for key in (transaction.id, transaction.tx):
+            self._responses[key] = cached
+            self._responses.move_to_end(key)
+        while len(self._responses) > self._maxsize:
+            _ = self._responses.popitem(last=False)
+        return cached
+
+
+transaction_responses = TransactionResponseCache()
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+
+import asqlite
+from fastapi import Request
+from fastapi.applications import FastAPI
+
+from database.oauth_state import delete_expired_oauth_states, insert_oauth_state, pop_oauth_state
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 60.0
+
+type StateValue = str
+type RedirectURL = str
+
+
+class StateStore(ABC):
+    """
+    Pending OAuth states, each with the redirect to use once the login completes.
+    A state can be consumed once. Expired states are swept away periodically
+    between ``start`` and ``close``, so abandoned logins do not pile up.
+    """
+
+    def __init__(self, sweep_interval: float = SWEEP_INTERVAL):
+        self._sweep_interval = sweep_interval
+        self._task: asyncio.Task[None] | None = None
+
+    @abstractmethod
+    async def put(self, state: StateValue, redirect: RedirectURL, expires_at: float) -> None: ...
+
+    @abstractmethod
+    async def pop(self, state: StateValue) -> tuple[RedirectURL, float] | None:
+        """Remove ``state`` and return its redirect and expiry, ``None`` if it is unknown."""
+
+    @abstractmethod
+    async def sweep(self, now: float) -> int:
+        """Drop every state expired at ``now`` and return how many were dropped."""
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="oauth-state-sweeper")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            _ = self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            try:
+                swept = await self.sweep(time.time())
+                if swept:
+                    logger.info("Swept %s expired OAuth states", swept)
+            except Exception:
+                logger.error("Failed to sweep OAuth states", exc_info=True)
+
+
+class MemoryStateStore(StateStore):
+    """States held by this process only, with a heap ordered by expiry for sweeping."""
+
+    def __init__(self, sweep_interval: float = SWEEP_INTERVAL):
+        super().__init__(sweep_interval)
+        self._states: dict[StateValue, tuple[RedirectURL, float]] = {}
+        self._expiry: list[tuple[float, StateValue]] = []
+
+    async def put(self, state: StateValue, redirect: RedirectURL, expires_at: float) -> None:
+        self._states[state] = (redirect, expires_at)
+        heapq.heappush(self._expiry, (expires_at, state))
+
+    async def pop(self, state: StateValue) -> tuple[RedirectURL, float] | None:
+        # Its heap entry is left behind and skipped by the next sweep
+        return self._states.pop(state, None)
+
+    async def sweep(self, now: float) -> int:
+        swept = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, state = heapq.heappop(self._expiry)
+            if self._states.pop(state, None) is not None:
+                swept += 1
+        return swept
+
+
+class SQLiteStateStore(StateStore):
+    """States in the ``oauth_state`` table, shared by every worker using the database."""
+
+    def __init__(self, pool: asqlite.Pool, sweep_interval: float = SWEEP_INTERVAL):
+        super().__init__(sweep_interval)
+        self._pool = pool
+
+    async def put(self, state: StateValue, redirect: RedirectURL, expires_at: float) -> None:
+        async with self._pool.acquire() as conn:
+            await insert_oauth_state(conn, state, redirect, expires_at)
+
+    async def pop(self, state: StateValue) -> tuple[RedirectURL, float] | None:
+        async with self._pool.acquire() as conn:
+            return await pop_oauth_state(conn, state)
+
+    async def sweep(self, now: float) -> int:
+        async with self._pool.acquire() as conn:
+            return await delete_expired_oauth_states(conn, now)
+
+
+async def start_state_store(app: FastAPI) -> None:
+    # ``memory`` only works with a single worker, a login may finish on another one
+    kind = os.environ.get("OAUTH_STATE_STORE", "sqlite")
+    if kind == "memory":
+        store: StateStore = MemoryStateStore()
+    elif kind == "sqlite":
+        store = SQLiteStateStore(app.state.db_pool)  # pyright: ignore[reportAny]
+    else:
+        raise ValueError(f"Unknown OAUTH_STATE_STORE {kind!r}, expected 'sqlite' or 'memory'")
+    await store.start()
+    app.state.state_store = store
+
+
+async def stop_state_store(app: FastAPI) -> None:
+    store: StateStore | None = getattr(app.state, "state_store", None)
+    if store:
+        await store.close()
+
+
+async def get_state_store(request: Request) -> StateStore:
+    return request.state.parent.state.state_store  # pyright: ignore[reportAny]
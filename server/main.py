@@ -7,13 +7,28 @@ from api.account import acc_app
 from api.transaction import tr_app
 from api.game import game_app
 from api.user import user_app
-from helper.db_helper import init_pool, close_pool
+from helper.db_helper import init_pool, close_pool, get_pool_info
+from helper.ledger_writer import start_ledger_writer, stop_ledger_writer
+from helper.game_pool import start_game_pool, stop_game_pool
+from helper.checkpoint_sealer import start_checkpoint_sealer, stop_checkpoint_sealer
+from helper.state_store import start_state_store, stop_state_store
+from helper.http_client import start_http_client, stop_http_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_pool(app)
+    await start_ledger_writer(app)
+    await start_game_pool(app)
+    await start_checkpoint_sealer(app)
+    await start_state_store(app)
+    await start_http_client(app)
     yield
+    await stop_http_client(app)
+    await stop_state_store(app)
+    await stop_checkpoint_sealer(app)
+    await stop_game_pool(app)
+    await stop_ledger_writer(app)
     await close_pool(app)
 
 
@@ -33,4 +48,4 @@ async def attach_parent(request: Request, call_next: Callable[[Request], Awaitab
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "db": await get_pool_info(app)}
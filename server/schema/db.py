@@ -1,22 +1,29 @@
 from dataclasses import dataclass
-from typing import Literal, Optional
+from typing import Annotated, Literal, Optional
 
+from pydantic import PlainSerializer, WithJsonSchema
 
-@dataclass(frozen=True, eq=True)
+
+@dataclass(frozen=True, eq=True, slots=True)
 class Coin:
     id: int
     unique_name: str
     name: str
 
-    def __repr__(self) -> str:
-        return self.unique_name
+
+# A coin used as a mapping key is written as its unique name
+type CoinKey = Annotated[
+    Coin,
+    PlainSerializer(lambda coin: coin.unique_name, return_type=str),
+    WithJsonSchema({"type": "string"}),
+]
 
 
 @dataclass(frozen=True)
 class Account:
     id: int
     holder_id: int
-    balance: dict[Coin, int]
+    balance: dict[CoinKey, int]
 
 
 @dataclass(frozen=True)
@@ -26,13 +33,13 @@ class User:
     accounts: list[Account]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Reward:
     id: int
     reason: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Game:
     id: int
     server_secret: str
@@ -41,7 +48,7 @@ class Game:
     user_win: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Transaction:
     id: int
     tx: str
@@ -66,3 +73,26 @@ class GameInstance:
     game_secret: str
     game_hash: str
     is_used: bool
+
+
+@dataclass(frozen=True)
+class ChainCheckpoint:
+    block_no: int
+    first_order_op: int
+    last_order_op: int
+    root: str
+
+
+@dataclass(frozen=True)
+class ProofStep:
+    sibling: str
+    left: bool
+
+
+@dataclass(frozen=True)
+class InclusionProof:
+    tx: str
+    order_op: int
+    leaf_index: int
+    checkpoint: ChainCheckpoint
+    path: list[ProofStep]
@@ -0,0 +1,5 @@
+-- Secondary indexes for holder/account lookups and transaction history
+CREATE INDEX IF NOT EXISTS idx_uni_transact_src ON uni_transact(src);
+CREATE INDEX IF NOT EXISTS idx_uni_transact_dst ON uni_transact(dst);
+CREATE INDEX IF NOT EXISTS idx_account_holder_id ON account(holder_id);
+CREATE INDEX IF NOT EXISTS idx_game_instance_create_dt ON game_instance(create_dt);
@@ -0,0 +1,8 @@
+-- Merkle roots over consecutive blocks of transact_chain entries
+CREATE TABLE IF NOT EXISTS chain_checkpoint(
+    block_no INTEGER PRIMARY KEY,
+    first_order_op INT NOT NULL,
+    last_order_op INT NOT NULL UNIQUE,
+    root TEXT NOT NULL,
+    create_dt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
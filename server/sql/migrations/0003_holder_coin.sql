@@ -0,0 +1,15 @@
+-- Per-holder coin totals, kept in step with user_coin by raw_force_transact
+CREATE TABLE IF NOT EXISTS holder_coin(
+    holder_id INT NOT NULL,
+    coin_id INT NOT NULL,
+    amount BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (holder_id, coin_id),
+    FOREIGN KEY (holder_id) REFERENCES holder_entity(holder_id),
+    FOREIGN KEY (coin_id) REFERENCES coin(id)
+) WITHOUT ROWID;
+
+INSERT INTO holder_coin(holder_id, coin_id, amount)
+SELECT a.holder_id, uc.coin_id, SUM(uc.amount)
+FROM user_coin uc
+INNER JOIN account a ON a.id = uc.account_id
+GROUP BY a.holder_id, uc.coin_id;
@@ -0,0 +1,11 @@
+-- Responses of write requests sent with an Idempotency-Key, replayed on retries
+CREATE TABLE IF NOT EXISTS idempotency_key(
+    user_id BIGINT NOT NULL,
+    key TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    response TEXT NOT NULL,
+    expires_at INTEGER NOT NULL,
+    PRIMARY KEY (user_id, key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_key_expires_at ON idempotency_key(expires_at);
@@ -0,0 +1,8 @@
+-- Pending Discord OAuth logins, shared by every server worker
+CREATE TABLE IF NOT EXISTS oauth_state(
+    state TEXT PRIMARY KEY,
+    redirect TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_oauth_state_expires_at ON oauth_state(expires_at);
@@ -0,0 +1,2 @@
+-- Lets the game pool sweep expired, never played instances without walking the played ones
+CREATE INDEX IF NOT EXISTS idx_game_instance_unused ON game_instance(create_dt) WHERE is_used = 0;
@@ -0,0 +1,150 @@
+"""
+Check that clients dropping ``/user/history/@me/export`` mid-stream leave no
+read-only connection stuck inside its snapshot transaction, and that stalled
+exports cannot take every read connection.
+
+Starts ``main.app`` under uvicorn against a scratch database with a small read
+pool. It first leaves more exports than ``DB_EXPORT_SLOTS`` unread while timing
+the read routes, then disconnects from the export of a long history a few times.
+Fails if any read route errors or is held up, or if any pooled read connection is
+still in a transaction.
+
+Usage (from the ``server`` directory)::
+
+    python -m tools.check_export_disconnect [--rows N] [--disconnects N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import aiohttp
+import asqlite
+import uvicorn
+
+for name, value in {
+    "JWT_SECRET": "check-secret-check-secret-check-secret",
+    "DISCORD_CLIENT_ID": "0",
+    "DISCORD_CLIENT_SECRET": "check",
+    "DISCORD_REDIRECT_URI": "http://localhost/auth/discord/callback",
+    "DB_READ_POOL_SIZE": "2",
+    "DB_EXPORT_SLOTS": "1",
+}.items():
+    _ = os.environ.setdefault(name, value)
+
+from crypto.jwt_handler import JWTHandler
+from database.transact import chain_tip, transact
+from database.user import create_user
+from helper import db_helper
+from main import app
+
+READ_ROUTES = ("/user/get/1", "/account/list/1", "/transaction/get/5")
+# A read route answering slower than this while exports stall is held up by them
+READ_TIMEOUT = 2.0
+
+
+async def seed(path: Path, rows: int) -> None:
+    """A user whose history is ``rows`` transactions long."""
+    async with asqlite.connect(path.as_posix()) as conn:
+        _ = await conn.executescript(db_helper.SCHEMA_PATH.read_text())
+        _ = await db_helper.migrate(conn)
+        _ = await chain_tip.load(conn)  # pyright: ignore[reportArgumentType]
+        _ = await conn.execute("BEGIN IMMEDIATE;")
+        user = await create_user(conn, 1)  # pyright: ignore[reportArgumentType]
+        for _ in range(rows):
+            _ = await transact(conn, 0, user.accounts[0].id, 0, 1)  # pyright: ignore[reportArgumentType]
+        _ = await conn.execute("COMMIT;")
+
+
+async def drive(base_url: str, disconnects: int) -> list[str]:
+    headers = {"X-API-KEY": JWTHandler(os.environ["JWT_SECRET"]).create_user(1)}
+    failures: list[str] = []
+    async with aiohttp.ClientSession(base_url) as session:
+        # Exports whose client stops reading, more of them than there are export slots
+        stalled: list[aiohttp.ClientResponse] = []
+        for _ in range(int(os.environ["DB_EXPORT_SLOTS"]) + 2):
+            try:
+                stalled.append(
+                    await asyncio.wait_for(
+                        session.get("/user/history/@me/export", headers=headers), READ_TIMEOUT
+                    )
+                )
+            except asyncio.TimeoutError:
+                failures.append("GET /user/history/@me/export held up by stalled exports")
+        await asyncio.sleep(0.5)
+        for path in READ_ROUTES:
+            try:
+                async with session.get(path, timeout=aiohttp.ClientTimeout(total=READ_TIMEOUT)) as resp:
+                    _ = await resp.read()
+            except asyncio.TimeoutError:
+                failures.append(f"GET {path} held up by stalled exports")
+        for resp in stalled:
+            resp.close()
+        await asyncio.sleep(0.2)
+
+        for _ in range(disconnects):
+            resp = await session.get("/user/history/@me/export", headers=headers)
+            _ = await resp.content.read(4096)
+            # Drop the connection with most of the export unread
+            resp.close()
+            await asyncio.sleep(0.2)
+        # Enough requests per route to go through every pooled connection
+        for path in READ_ROUTES * 4:
+            async with session.get(path) as resp:
+                if resp.status != 200:
+                    failures.append(f"GET {path} -> {resp.status}")
+    return failures
+
+
+async def stuck_connections() -> int:
+    pool: asqlite.Pool = app.state.db_read_pool  # pyright: ignore[reportAny]
+    stuck = 0
+    for _ in range(int(os.environ["DB_READ_POOL_SIZE"])):
+        async with pool.acquire() as conn:
+            stuck += conn.get_connection().in_transaction
+    return stuck
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument("--rows", type=int, default=20_000)
+    _ = parser.add_argument("--disconnects", type=int, default=5)
+    _ = parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_helper.DB_PATH = Path(tmp) / "gamba.db"
+        asyncio.run(seed(db_helper.DB_PATH, args.rows))
+
+        server = uvicorn.Server(
+            uvicorn.Config(app, port=args.port, log_level="critical", access_log=False)
+        )
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_until_complete, args=(server.serve(),), daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        try:
+            failures = asyncio.run(drive(f"http://127.0.0.1:{args.port}", args.disconnects))
+            # The pool belongs to the server's event loop
+            stuck = asyncio.run_coroutine_threadsafe(stuck_connections(), loop).result()
+        finally:
+            server.should_exit = True
+            thread.join()
+            loop.close()
+
+    if stuck:
+        failures.append(f"{stuck} read connection(s) left inside a transaction")
+    for failure in failures:
+        print(failure)
+    print(f"{args.disconnects} disconnect(s), {len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Check that ``holder_coin`` matches the per-holder totals recomputed from
+``user_coin``, and optionally rebuild it from them.
+
+Usage (from the ``server`` directory)::
+
+    python -m tools.check_holder_coin [--fix]
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+from helper.db_helper import DB_PATH
+
+_EXPECTED_QUERY = """
+SELECT a.holder_id, uc.coin_id, SUM(uc.amount)
+FROM user_coin uc
+INNER JOIN account a ON a.id = uc.account_id
+GROUP BY a.holder_id, uc.coin_id
+"""
+
+type Totals = dict[tuple[int, int], int]
+
+
+def _totals(conn: sqlite3.Connection, sql: str) -> Totals:
+    return {(holder_id, coin_id): amount for holder_id, coin_id, amount in conn.execute(sql)}
+
+
+def find_mismatches(conn: sqlite3.Connection) -> list[tuple[int, int, int | None, int | None]]:
+    """``(holder_id, coin_id, stored, expected)`` for every total that differs."""
+    # One read transaction, so a write committed between the two reads can't show as a mismatch
+    _ = conn.execute("BEGIN")
+    try:
+        expected = _totals(conn, _EXPECTED_QUERY)
+        stored = _totals(conn, "SELECT holder_id, coin_id, amount FROM holder_coin")
+    finally:
+        _ = conn.execute("COMMIT")
+    return [
+        (*key, stored.get(key), expected.get(key))
+        for key in sorted(expected.keys() | stored.keys())
+        if stored.get(key) != expected.get(key)
+    ]
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    _ = conn.execute("BEGIN IMMEDIATE")
+    try:
+        _ = conn.execute("DELETE FROM holder_coin")
+        _ = conn.execute(f"INSERT INTO holder_coin(holder_id, coin_id, amount) {_EXPECTED_QUERY}")
+    except Exception:
+        _ = conn.execute("ROLLBACK")
+        raise
+    _ = conn.execute("COMMIT")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument("--db", type=Path, default=DB_PATH)
+    _ = parser.add_argument("--fix", action="store_true", help="rebuild holder_coin from user_coin")
+    args = parser.parse_args()
+
+    mode = "rw" if args.fix else "ro"
+    conn = sqlite3.connect(
+        f"file:{args.db.absolute().as_posix()}?mode={mode}", uri=True, isolation_level=None
+    )
+    mismatches = find_mismatches(conn)
+    for holder_id, coin_id, stored, expected in mismatches:
+        print(f"holder {holder_id} coin {coin_id}: stored {stored}, expected {expected}")
+    print(f"{len(mismatches)} mismatch(es)")
+    if mismatches and args.fix:
+        rebuild(conn)
+        print("Rebuilt holder_coin from user_coin")
+        mismatches = find_mismatches(conn)
+    conn.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
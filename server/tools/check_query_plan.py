@@ -0,0 +1,145 @@
+"""
+Run the hot paths of ``database/`` against a scratch database and fail if any of
+the statements they issue is planned as a full table scan.
+
+Usage (from the ``server`` directory)::
+
+    python -m tools.check_query_plan
+"""
+
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import asqlite
+
+from database.account import get_account_by_id, get_holder_account
+from database.checkpoint import get_inclusion_proof, seal_checkpoints
+from database.coin import get_holder_balance, get_holder_coin_balance as coin_holder_balance
+from database.game import (
+    create_game_instance,
+    delete_expired_game_instances,
+    delete_unused_game_instances,
+    mark_game_instance_completed,
+)
+from database.holder import (
+    game_force_transfer_holder_to_system,
+    get_holder_coin_balance,
+    holder_transact,
+)
+from database.idempotency import get_idempotent_response, store_idempotent_response
+from database.oauth_state import delete_expired_oauth_states, insert_oauth_state, pop_oauth_state
+from database.transact import (
+    chain_tip,
+    get_transaction_by_tx,
+    get_transaction_by_uni_id,
+    get_transactions_by_partial_tx,
+    iter_holder_transactions,
+    list_account_transactions,
+    list_holder_transactions,
+    transact,
+)
+from database.user import create_user, get_user
+from helper.db_helper import SCHEMA_PATH, migrate
+
+SKIPPED_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+
+class RecordingConnection:
+    """Forwards to a real connection and remembers every statement executed."""
+
+    def __init__(self, conn: asqlite.Connection):
+        self._conn = conn
+        self.statements: dict[str, tuple[Any, ...]] = {}
+
+    async def execute(self, sql: str, parameters: tuple[Any, ...] = ()):
+        if not sql.lstrip().upper().startswith(SKIPPED_PREFIXES):
+            _ = self.statements.setdefault(sql, tuple(parameters))
+        return await self._conn.execute(sql, parameters)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+def _is_table_scan(line: str) -> bool:
+    # Scans of subquery co-routines and constant rows are bounded by the query itself
+    return line.startswith("SCAN ") and not line.startswith(("SCAN (", "SCAN CONSTANT ROW"))
+
+
+async def exercise(conn: Any) -> None:
+    alice = await create_user(conn, 1)
+    bob = await create_user(conn, 2)
+    alice_acc, bob_acc = alice.accounts[0].id, bob.accounts[0].id
+
+    tid, _ = await transact(conn, alice_acc, bob_acc, 0, 10)
+    _ = await holder_transact(conn, bob.holder_id, alice_acc, 0, 5)
+    _ = await create_game_instance(conn, "game", "secret")
+    _ = await mark_game_instance_completed(conn, "game")
+    _ = await delete_unused_game_instances(conn, ["game"])
+    _ = await delete_expired_game_instances(conn, 86400)
+    _ = await game_force_transfer_holder_to_system(
+        conn, alice.holder_id, 0, 1, "server", "client", False, "game"
+    )
+
+    _ = await get_user(conn, 1)
+    _ = await get_holder_account(conn, alice.holder_id)
+    _ = await get_account_by_id(conn, alice_acc)
+    _ = await get_holder_coin_balance(conn, alice.holder_id, 0)
+    _ = await coin_holder_balance(conn, alice.holder_id, 0)
+    _ = await get_holder_balance(conn, alice.holder_id)
+    _ = await list_account_transactions(conn, alice_acc)
+    _ = await list_holder_transactions(conn, alice.holder_id)
+    _ = await list_account_transactions(conn, alice_acc, before_id=tid)
+    _ = await list_holder_transactions(conn, alice.holder_id, after_id=tid)
+    async for _ in iter_holder_transactions(conn, alice.holder_id, batch_size=1):
+        pass
+    transaction = await get_transaction_by_uni_id(conn, tid)
+    assert transaction is not None
+    _ = await get_transaction_by_tx(conn, transaction.tx)
+    _ = await get_transactions_by_partial_tx(conn, transaction.tx[:8])
+    _ = await seal_checkpoints(conn, block_size=2)
+    _ = await get_inclusion_proof(conn, transaction.tx)
+    await store_idempotent_response(conn, 1, "key", "hash", "{}", 0, 60)
+    _ = await get_idempotent_response(conn, 1, "key", "hash", 0)
+    await insert_oauth_state(conn, "state", "/", 60.0)
+    _ = await pop_oauth_state(conn, "state")
+    _ = await delete_expired_oauth_states(conn, 0.0)
+
+
+async def check(run: Callable[[Any], Awaitable[None]] = exercise) -> list[tuple[str, list[str]]]:
+    async with asqlite.connect(":memory:") as conn:
+        _ = await conn.executescript(SCHEMA_PATH.read_text())
+        _ = await migrate(conn)
+        # The tip is loaded once at startup rather than per write
+        _ = await chain_tip.load(conn)  # pyright: ignore[reportArgumentType]
+
+        recorder = RecordingConnection(conn)
+        await run(recorder)
+
+        failures: list[tuple[str, list[str]]] = []
+        for sql, params in recorder.statements.items():
+            plan = [
+                str(row[3])
+                for row in await (
+                    await conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                ).fetchall()
+            ]
+            if any(_is_table_scan(line) for line in plan):
+                failures.append((sql, plan))
+        print(f"Checked {len(recorder.statements)} statements, {len(failures)} scan(s)")
+        return failures
+
+
+def main() -> int:
+    failures = asyncio.run(check())
+    for sql, plan in failures:
+        print("-" * 60)
+        print(sql.strip())
+        for line in plan:
+            print(f"  {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Verify the transaction hash chain.
+
+For every ``transact_chain`` row, in ``order_op`` order, checks that
+
+* ``tx == SHA3_512(prev_tx :: SHA3_512(transact_data))``, and
+* ``uni_transact.inner_hash`` is ``SHA3_512`` of the ``transact_data`` of the
+  ``game_transact``/``reward_transact`` row referencing it (or empty if none does).
+
+The per-row hashes do not depend on each other and are computed in a process
+pool; only the cheap chain fold is sequential. Progress up to the last verified
+row is saved to a checkpoint file so a re-run only verifies rows added since.
+Merkle roots in ``chain_checkpoint`` sealed over those rows are recomputed too.
+
+A single inclusion proof from ``/transaction/proof/{tx}`` can be checked against
+its block root without walking the chain with ``--proof``.
+
+Usage (from the ``server`` directory)::
+
+    python -m tools.verify_chain [--reset] [--workers N]
+    python -m tools.verify_chain --proof proof.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from crypto.hashing import sha3_512_hex, sha3_512_hex_many
+from database.checkpoint import merkle_root, verify_inclusion
+from database.transact import GENESIS_TX
+from helper.db_helper import DB_PATH
+from schema.db import ProofStep
+
+CHECKPOINT_PATH = DB_PATH.with_name("verify_chain.checkpoint.json")
+
+CHUNK_SIZE = 2000
+
+_CHAIN_QUERY = """
+SELECT tc.order_op, tc.tx, u.id, u.transact_data, u.inner_hash,
+       COALESCE(gt.transact_data, rt.transact_data)
+FROM transact_chain tc
+INNER JOIN uni_transact u ON u.id = tc.transact_id
+LEFT JOIN game_transact gt ON gt.ref_id = u.id
+LEFT JOIN reward_transact rt ON rt.ref_id = u.id
+WHERE tc.order_op > ?
+ORDER BY tc.order_op
+"""
+
+type Row = tuple[int, str, int, str, str, str | None]
+# (order_op, tx, transact_id, self_hash, inner_hash_ok)
+type HashedRow = tuple[int, str, int, str, bool]
+
+
+def hash_rows(rows: list[Row]) -> list[HashedRow]:
+    self_hashes = sha3_512_hex_many(row[3] for row in rows)
+    inner_hashes = sha3_512_hex_many(row[5] for row in rows if row[5] is not None)
+    expected_inner = iter(inner_hashes)
+    return [
+        (
+            order_op,
+            tx,
+            transact_id,
+            self_hash,
+            inner_hash == (next(expected_inner) if detail_data is not None else ""),
+        )
+        for (order_op, tx, transact_id, _, inner_hash, detail_data), self_hash in zip(rows, self_hashes)
+    ]
+
+
+@dataclass
+class Checkpoint:
+    order_op: int = 0
+    tx: str = GENESIS_TX
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint":
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        return cls(int(data["order_op"]), str(data["tx"]))
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        _ = tmp.write_text(json.dumps({"order_op": self.order_op, "tx": self.tx}))
+        _ = tmp.replace(path)
+
+
+def _windows(cur: sqlite3.Cursor, size: int) -> Iterator[list[list[Row]]]:
+    """Yield lists of ``size`` chunks so at most one window is in flight at a time."""
+    while True:
+        window: list[list[Row]] = []
+        for _ in range(size):
+            chunk = cur.fetchmany(CHUNK_SIZE)
+            if not chunk:
+                break
+            window.append(chunk)
+        if not window:
+            return
+        yield window
+
+
+def verify(db_path: Path, checkpoint_path: Path, workers: int, reset: bool) -> int:
+    conn = sqlite3.connect(f"file:{db_path.absolute().as_posix()}?mode=ro", uri=True)
+    checkpoint = Checkpoint() if reset else Checkpoint.load(checkpoint_path)
+    if checkpoint.order_op:
+        row = conn.execute(
+            "SELECT tx FROM transact_chain WHERE order_op = ?", (checkpoint.order_op,)
+        ).fetchone()
+        if row is None or row[0] != checkpoint.tx:
+            print("Checkpoint no longer matches the ledger, verifying from genesis")
+            checkpoint = Checkpoint()
+
+    start_order_op = checkpoint.order_op
+    prev_tx = checkpoint.tx
+    verified_prefix = True
+    failures = 0
+    rows = 0
+    started = time.perf_counter()
+    cur = conn.execute(_CHAIN_QUERY, (checkpoint.order_op,))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for window in _windows(cur, workers * 2):
+            for hashed in pool.map(hash_rows, window):
+                for order_op, tx, transact_id, self_hash, inner_ok in hashed:
+                    rows += 1
+                    chain_ok = sha3_512_hex(f"{prev_tx}::{self_hash}") == tx
+                    if not chain_ok:
+                        print(f"order_op {order_op} (transaction {transact_id}): chain hash mismatch")
+                    if not inner_ok:
+                        print(f"order_op {order_op} (transaction {transact_id}): inner hash mismatch")
+                    if chain_ok and inner_ok:
+                        if verified_prefix:
+                            checkpoint = Checkpoint(order_op, tx)
+                    else:
+                        failures += 1
+                        verified_prefix = False
+                    # Keep folding from the stored hash so one bad row is reported once
+                    prev_tx = tx
+            checkpoint.save(checkpoint_path)
+
+    blocks = conn.execute(
+        "SELECT block_no, first_order_op, last_order_op, root FROM chain_checkpoint "
+        "WHERE last_order_op > ? ORDER BY block_no",
+        (start_order_op,),
+    ).fetchall()
+    for block_no, first_order_op, last_order_op, root in blocks:
+        txs = [
+            row[0]
+            for row in conn.execute(
+                "SELECT tx FROM transact_chain WHERE order_op BETWEEN ? AND ? ORDER BY order_op",
+                (first_order_op, last_order_op),
+            )
+        ]
+        if merkle_root(txs) != root:
+            print(f"block {block_no} (order_op {first_order_op}-{last_order_op}): Merkle root mismatch")
+            failures += 1
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Verified {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s), "
+        f"{len(blocks)} block root(s), {failures} failure(s), "
+        f"checkpoint at order_op {checkpoint.order_op}"
+    )
+    return 1 if failures else 0
+
+
+def verify_proof(proof_path: Path, db_path: Path) -> int:
+    proof = json.loads(proof_path.read_text())
+    path = [ProofStep(step["sibling"], step["left"]) for step in proof["path"]]
+    root: str = proof["checkpoint"]["root"]
+    if not verify_inclusion(proof["tx"], path, root):
+        print(f"Proof for {proof['tx']} does not lead to root {root}")
+        return 1
+    print(f"{proof['tx']} is included under block {proof['checkpoint']['block_no']} root {root}")
+    if db_path.exists():
+        conn = sqlite3.connect(f"file:{db_path.absolute().as_posix()}?mode=ro", uri=True)
+        row = conn.execute(
+            "SELECT root FROM chain_checkpoint WHERE block_no = ?",
+            (proof["checkpoint"]["block_no"],),
+        ).fetchone()
+        conn.close()
+        if row is None or row[0] != root:
+            print("The root does not match the one stored in the ledger")
+            return 1
+        print("The root matches the one stored in the ledger")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument("--db", type=Path, default=DB_PATH)
+    _ = parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_PATH)
+    _ = parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    _ = parser.add_argument("--reset", action="store_true", help="ignore the checkpoint")
+    _ = parser.add_argument("--proof", type=Path, help="check a saved inclusion proof instead")
+    args = parser.parse_args()
+    if args.proof:
+        return verify_proof(args.proof, args.db)
+    return verify(args.db, args.checkpoint, args.workers, args.reset)
+
+
+if __name__ == "__main__":
+    sys.exit(main())